@@ -4,24 +4,52 @@ set -e -o pipefail
 
 current_file_name=$1
 
-# This function should be called for each generated file with the file's name as the first argument and the command to call to produce the file's content as the remaining arguments.
+# With --batch, all files are generated by a single invocation of the generators. These are the arguments passed to it.
+batch_jobs=()
+
+# Run the command in generate_command to produce the file file_name.
+function run_generate_command() {
+	mkdir -p "$(dirname "$file_name")"
+	GENERATOR_OUTPUT=$file_name "${generate_command[@]}" "$file_name"
+}
+
+# This function should be called for each generated file with the file's name as the first argument and the command to call to produce the file as the remaining arguments. The name of the file is passed to the command as an additional argument.
 function generate_file() {
 	file_name=$1
 	shift
 	generate_command=("$@")
 	
-	if ! [ "$current_file_name" ]; then
+	if [ "$current_file_name" == "--batch" ]; then
+		if [ "${generate_command[0]}" == "generate" ]; then
+			# An invocation of generate() is replaced by a job for the batch entry point.
+			mkdir -p "$(dirname "$file_name")"
+			batch_jobs+=("${generate_command[@]:1}" "$file_name")
+		else
+			run_generate_command
+		fi
+	elif ! [ "$current_file_name" ]; then
 		echo "$file_name"
 	elif [ "$current_file_name" == "$file_name" ]; then
-		mkdir -p "$(dirname "$file_name")"
-		"${generate_command[@]}" > "$file_name"
+		run_generate_command
 	fi
 }
 
+# The generators are run by the server started with --server, if it is running, and otherwise by the client itself.
+export GENERATOR_CACHE_DIR=.cache/generator GENERATOR_SOCKET=.cache/generator.sock PYTHONPATH=generator
+
 generate() {
-	PYTHONPATH=generator venv/bin/python -m "generate.$1" "$2"
+	venv/bin/python -m worker.client "$1" "$2" "$3"
 }
 
+generate_batch() {
+	venv/bin/python -m worker.client "$@"
+}
+
+if [ "$current_file_name" == "--server" ]; then
+	mkdir -p .cache
+	exec venv/bin/python -m worker.server
+fi
+
 for i in src/polyhedra/*.json; do
 	name=${i#src/polyhedra/}
 	name=${name%.json}
@@ -30,7 +58,15 @@ for i in src/polyhedra/*.json; do
 		generate_file "src/$j/$name.asy" generate "$j" "$i"
 	done
 	
-	for j in models stellations assembled; do
+	for j in models stellations; do
 		generate_file "src/$j/$name.scad" generate "$j" "$i"
 	done
+	
+	# The assembled panels are written as STL files directly. The labels are engraved by a separate OpenSCAD file, which is not compiled by default.
+	generate_file "src/assembled/$name.stl" generate assembled "$i"
+	generate_file "src/assembled/_${name}_labeled.scad" generate labels "$i"
 done
+
+if [ "$current_file_name" == "--batch" ] && [ "${#batch_jobs[@]}" -gt 0 ]; then
+	generate_batch "${batch_jobs[@]}"
+fi
@@ -0,0 +1,157 @@
+import os, glob, json, time, importlib, contextlib, tracemalloc
+from lib import trace, util, cache
+
+
+generator_names = ['faces', 'tenons', 'stellations', 'models', 'assembled', 'labels']
+
+# Metrics which are compared against the baseline. Metrics derived from time measurements use a larger threshold, as they are noisy.
+compared_metrics = ['time', 'load', 'compute', 'export', 'clipper_calls', 'output_vertices', 'peak_memory']
+timing_metrics = ['time', 'load', 'compute', 'export']
+
+# Relative increase of a metric over the baseline which is reported as a regression.
+default_threshold = 0.1
+default_timing_threshold = 0.25
+
+# Stage times below this are not compared, as they are dominated by noise.
+min_compared_time = 0.01
+
+
+def _run_generator(generator_name, src_path):
+	"""
+	Run the main function of the specified generator on the specified input file, discarding the output.
+	"""
+	
+	module = importlib.import_module('generate.' + generator_name)
+	
+	with contextlib.redirect_stdout(util.output_file()), util.stage('compute'):
+		module.main(src_path)
+
+
+def _measure(generator_name, src_path, repeat):
+	"""
+	Return a dict with the metrics for running the specified generator on the specified input file.
+	
+	The times are taken from the fastest of the specified number of runs. The counts and the peak memory usage are taken from a separate run, as tracing slows down the generator.
+	"""
+	
+	runs = []
+	
+	for _ in range(repeat):
+		with util.collecting_metrics() as metrics:
+			start_time = time.perf_counter()
+			_run_generator(generator_name, src_path)
+			duration = time.perf_counter() - start_time
+		
+		runs.append((duration, metrics.stage_times))
+	
+	duration, stage_times = min(runs, key = lambda x: x[0])
+	
+	tracemalloc.start()
+	
+	try:
+		with util.collecting_metrics() as metrics, trace.tracing() as clipper_trace:
+			_run_generator(generator_name, src_path)
+		
+		_, peak_memory = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+	
+	return dict(
+		time = duration,
+		load = stage_times.get('load', 0.0),
+		compute = stage_times.get('compute', 0.0),
+		export = stage_times.get('export', 0.0),
+		clipper_calls = clipper_trace.stats()['total']['count'],
+		output_vertices = metrics.counters.get('output_vertices', 0),
+		peak_memory = peak_memory)
+
+
+def _compare(results, baseline, threshold, timing_threshold):
+	"""
+	Return a list of descriptions of the metrics which increased by more than the threshold compared to the baseline.
+	"""
+	
+	regressions = []
+	
+	for name, generator_results in sorted(results.items()):
+		for generator_name, metrics in sorted(generator_results.items()):
+			baseline_metrics = baseline.get(name, { }).get(generator_name)
+			
+			if baseline_metrics is None:
+				continue
+			
+			for i in compared_metrics:
+				old = baseline_metrics.get(i)
+				new = metrics[i]
+				
+				if i in timing_metrics:
+					if old is None or max(old, new) < min_compared_time:
+						continue
+					
+					limit = timing_threshold
+				else:
+					limit = threshold
+				
+				if new > old * (1 + limit):
+					regressions.append('{} {} {}: {} -> {} ({:+.0%})'.format(name, generator_name, i, old, new, new / old - 1 if old else float('inf')))
+	
+	return regressions
+
+
+def _format_results(results):
+	lines = ['{:<40} {:<12} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}'.format('polyhedron', 'generator', 'time', 'load', 'compute', 'export', 'clipper', 'vertices', 'memory')]
+	
+	for name, generator_results in sorted(results.items()):
+		for generator_name, i in sorted(generator_results.items()):
+			lines.append('{:<40} {:<12} {:>9.3f} {:>9.3f} {:>9.3f} {:>9.3f} {:>9} {:>9} {:>8.1f}M'.format(name, generator_name, i['time'], i['load'], i['compute'], i['export'], i['clipper_calls'], i['output_vertices'], i['peak_memory'] / (1 << 20)))
+	
+	return '\n'.join(lines)
+
+
+@util.main
+def main(command, baseline_path, *src_paths):
+	"""
+	Run each generator on each specified polyhedron (all in src/polyhedra by default) and measure the time spent in each stage, the number of Clipper operations, the number of exported vertices and the peak memory usage.
+	
+	Usage: python -m benchmarks.catalog (save|compare) <baseline.json> [<polyhedron.json> ...]
+	
+	`save` writes the results to the baseline file. `compare` compares them against the baseline file and fails if any metric regressed by more than the threshold. The environment variables BENCHMARK_REPEAT, BENCHMARK_THRESHOLD and BENCHMARK_TIMING_THRESHOLD override the number of runs and the thresholds.
+	"""
+	
+	if command not in ['save', 'compare']:
+		raise util.UserError('Unknown command: {}', command)
+	
+	repeat = int(os.environ.get('BENCHMARK_REPEAT', 3))
+	threshold = float(os.environ.get('BENCHMARK_THRESHOLD', default_threshold))
+	timing_threshold = float(os.environ.get('BENCHMARK_TIMING_THRESHOLD', default_timing_threshold))
+	
+	if not src_paths:
+		src_paths = sorted(glob.glob('src/polyhedra/*.json'))
+	
+	# Results taken from the cache would not measure anything.
+	os.environ.pop(cache.cache_dir_variable, None)
+	
+	results = { }
+	
+	for i in src_paths:
+		name, _ = os.path.splitext(os.path.basename(i))
+		
+		for j in generator_names:
+			util.log('{} {}', name, j)
+			results.setdefault(name, { })[j] = _measure(j, i, repeat)
+	
+	print(_format_results(results))
+	
+	if command == 'save':
+		util.write_text_file(baseline_path, json.dumps(results, indent = 2, sort_keys = True) + '\n')
+	else:
+		baseline = json.loads(util.read_text_file(baseline_path))
+		regressions = _compare(results, baseline, threshold, timing_threshold)
+		
+		if regressions:
+			for i in regressions:
+				util.log('Regression: {}', i)
+			
+			raise util.UserError('{} metrics regressed compared to {}.', len(regressions), baseline_path)
+		
+		util.log('No regressions compared to {}.', baseline_path)
@@ -0,0 +1,96 @@
+import os, sys, subprocess
+from lib import util
+
+
+# Modules which are run as scripts, most of them for each generated file, and whose import time is checked.
+entry_points = ['worker.client', 'generate.__main__', 'generate.faces', 'generate.tenons', 'generate.models', 'generate.stellations', 'generate.assembled', 'generate.labels', 'dihedral.dihedral']
+
+# Modules which must not be loaded while importing the entry points. They are loaded using `util.lazy_import()` when first used.
+deferred_modules = ['numpy', 'pyclipper', 'pickle', 'csv', 'cProfile', 'tracemalloc']
+
+# Default for the maximum time in milliseconds importing an entry point may take.
+default_budget = 30
+
+# Number of imports reported with the largest self time, when an entry point exceeds the budget.
+reported_import_count = 5
+
+
+def _parse_importtime(output):
+	"""
+	Parse the output of `python -X importtime` and return a list of tuples of the self time and cumulative time in microseconds, the nesting level and the name of each imported module.
+	"""
+	
+	entries = []
+	
+	for line in output.splitlines():
+		prefix, _, rest = line.partition('import time:')
+		
+		if prefix or not rest:
+			continue
+		
+		self_time, cumulative_time, name = rest.split('|')
+		
+		# Skip the header line.
+		if not self_time.strip().isdigit():
+			continue
+		
+		stripped_name = name.lstrip()
+		level = (len(name) - len(stripped_name) - 1) // 2
+		entries.append((int(self_time), int(cumulative_time), level, stripped_name))
+	
+	return entries
+
+
+def _measure(module_name):
+	"""
+	Import the specified module in a new interpreter and return the time in milliseconds it took and the list of entries produced by `_parse_importtime()`.
+	
+	The time includes the packages containing the module, but not the modules loaded while the interpreter starts.
+	"""
+	
+	output = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module_name], stdout = subprocess.DEVNULL, stderr = subprocess.PIPE, check = True).stderr.decode()
+	entries = _parse_importtime(output)
+	parts = module_name.split('.')
+	packages = set('.'.join(parts[:i + 1]) for i in range(len(parts)))
+	
+	return sum(cumulative_time for _, cumulative_time, level, name in entries if not level and name in packages) / 1000, entries
+
+
+def _get_deferred_modules_loaded(entries):
+	return sorted(set(i for _, _, _, name in entries for i in deferred_modules if name == i or name.startswith(i + '.')))
+
+
+@util.main
+def main(*module_names):
+	"""
+	Check that importing the modules run for each generated file stays within a time budget and does not load the modules listed in `deferred_modules`.
+	
+	Usage: python -m benchmarks.importtime [<module> ...]
+	
+	Defaults to checking all modules listed in `entry_points`. Each module is imported in a new interpreter using `python -X importtime` and the fastest of a number of runs is used, which can be set using the environment variable BENCHMARK_REPEAT. The environment variable BENCHMARK_IMPORT_BUDGET overrides the budget in milliseconds. Exits with an error if any module exceeds the budget.
+	"""
+	
+	repeat = int(os.environ.get('BENCHMARK_REPEAT', 5))
+	budget = float(os.environ.get('BENCHMARK_IMPORT_BUDGET', default_budget))
+	
+	# Compile all modules first, so that compiling them is not measured.
+	subprocess.run([sys.executable, '-c', 'import ' + ', '.join(module_names or entry_points)], env = dict(os.environ, PYTHONDONTWRITEBYTECODE = ''), check = True)
+	
+	failures = []
+	
+	for module_name in module_names or entry_points:
+		duration, entries = min((_measure(module_name) for _ in range(repeat)), key = lambda x: x[0])
+		loaded_modules = _get_deferred_modules_loaded(entries)
+		print('{:<24} {:>8.1f} ms'.format(module_name, duration))
+		
+		if loaded_modules:
+			failures.append('{} loads {}'.format(module_name, ', '.join(loaded_modules)))
+		
+		if duration > budget:
+			failures.append('{} takes {:.1f} ms to import, which exceeds the budget of {:g} ms'.format(module_name, duration, budget))
+			
+			for self_time, _, _, name in sorted(entries, reverse = True)[:reported_import_count]:
+				print('    {:<20} {:>8.1f} ms'.format(name, self_time / 1000))
+	
+	if failures:
+		raise util.UserError('Import time check failed:\n{}', '\n'.join(failures))
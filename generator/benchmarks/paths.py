@@ -0,0 +1,145 @@
+import os, json, time, datetime, functools, operator, subprocess, numpy
+from lib import paths, util
+
+
+def _circles(n):
+	# Circles around the origin, each overlapping with its neighbors.
+	return [paths.rotate(turns = i / n) * paths.move(x = 1) * paths.circle() for i in range(n)]
+
+
+def _half_planes(n):
+	# Like the pattern in d.asy of test.py.
+	a = functools.reduce(operator.xor, [paths.half_plane((i, 0), (0, 1)) for i in range(-n, n + 1)])
+	
+	return paths.scale(20) * paths.circle() & functools.reduce(operator.xor, (paths.rotate(turns = i / (2 * n)) * a for i in range(n)))
+
+
+def _transform_chain(n):
+	polygon = paths.circle() | paths.move(x = 1) * paths.square()
+	
+	for i in range(n):
+		polygon = paths.rotate(turns = 1 / 7) * paths.scale(1.01) * paths.move(x = 0.1) * polygon
+	
+	return polygon
+
+
+def _copies(n):
+	# Copies of the same boolean subtree, which only differ in their position and orientation, like the parts placed in the generators.
+	part = functools.reduce(operator.xor, _circles(32)) / (paths.scale(0.5) * paths.circle())
+	
+	return functools.reduce(operator.or_, (paths.rotate(turns = i / n) * paths.move(x = 5 * n) * part for i in range(n)))
+
+
+def _render_polygon(n):
+	return paths.move(1, 1) * paths.polygon([(numpy.cos(util.tau * i / n), numpy.sin(util.tau * i / n)) for i in range(n)])
+
+
+def _project_half_planes(n):
+	half_planes = [paths.half_plane((i, 0), (numpy.cos(i), numpy.sin(i))) for i in range(n)]
+	evaluation = paths._Evaluation(1 << 20)
+	tm = numpy.diag([evaluation.scale, evaluation.scale, 1])
+	
+	def fn():
+		for i in half_planes:
+			i._get_pyclipper_paths(tm, evaluation)
+	
+	return fn
+
+
+def _evaluating(create_polygon):
+	"""
+	Return a function for a benchmark case which evaluates a polygon created by the specified function. The polygon is created before the measurement starts.
+	"""
+	
+	def create(n):
+		polygon = create_polygon(n)
+		
+		return lambda: polygon.paths
+	
+	return create
+
+
+# For each benchmark case, a function which takes the size parameter and returns a function to measure, and the sizes to run it with. The function returned is called once, as all results are cached on the polygons.
+cases = {
+	'union': (_evaluating(lambda n: functools.reduce(operator.or_, _circles(n))), [4, 16, 64]),
+	'intersection': (_evaluating(lambda n: functools.reduce(operator.and_, _circles(n))), [4, 16, 64]),
+	'xor': (_evaluating(lambda n: functools.reduce(operator.xor, _circles(n))), [4, 16, 64]),
+	'half_planes': (_evaluating(_half_planes), [2, 4, 8]),
+	'transform_chain': (_evaluating(_transform_chain), [10, 100, 300]),
+	'copies': (_evaluating(_copies), [4, 16, 64]),
+	'render': (_evaluating(_render_polygon), [100, 10000, 100000]),
+	'project_half_planes': (_project_half_planes, [10, 100, 1000]) }
+
+
+def _measure(create, size, repeat):
+	"""
+	Return the minimum time in seconds over the specified number of runs of a benchmark case.
+	"""
+	
+	def run():
+		fn = create(size)
+		start_time = time.perf_counter()
+		fn()
+		
+		return time.perf_counter() - start_time
+	
+	return min(run() for _ in range(repeat))
+
+
+def _get_revision():
+	try:
+		return subprocess.check_output(['git', 'describe', '--always', '--dirty'], stderr = subprocess.DEVNULL).decode().strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+
+
+def _read_history(path):
+	if not os.path.exists(path):
+		return []
+	
+	return [json.loads(i) for i in util.read_text_file(path).splitlines() if i.strip()]
+
+
+@util.main
+def main(history_path, *case_names):
+	"""
+	Run micro-benchmarks for the evaluation of polygons, append the results to the specified history file and compare them to the previous entry in that file.
+	
+	Usage: python -m benchmarks.paths <history.jsonl> [<case> ...]
+	
+	The history file contains one JSON object per line. The environment variable BENCHMARK_REPEAT overrides the number of runs of each case, of which the fastest one is used.
+	"""
+	
+	repeat = int(os.environ.get('BENCHMARK_REPEAT', 5))
+	
+	for i in case_names:
+		if i not in cases:
+			raise util.UserError('Unknown benchmark case: {}', i)
+	
+	history = _read_history(history_path)
+	previous = { }
+	
+	# Compare to the latest result of each case, in case only some cases were run.
+	for i in history:
+		previous.update(i['results'])
+	
+	results = { }
+	
+	for name, (create, sizes) in cases.items():
+		if case_names and name not in case_names:
+			continue
+		
+		for size in sizes:
+			key = '{}/{}'.format(name, size)
+			results[key] = duration = _measure(create, size, repeat)
+			old = previous.get(key)
+			
+			if old is None:
+				print('{:<28} {:>10.3f} ms'.format(key, duration * 1000))
+			else:
+				print('{:<28} {:>10.3f} ms {:>+7.1%}'.format(key, duration * 1000, duration / old - 1))
+	
+	entry = dict(date = datetime.datetime.now().isoformat(timespec = 'seconds'), revision = _get_revision(), repeat = repeat, results = results)
+	lines = [json.dumps(i, sort_keys = True) for i in history + [entry]]
+	
+	util.write_text_file(history_path, '\n'.join(lines) + '\n')
@@ -1,7 +1,10 @@
-import sys, numpy
-from lib import polyhedra
+from lib import polyhedra, util
 
 
+numpy = util.lazy_import('numpy')
+
+
+@util.main
 def main(src_path):
 	polyhedron = polyhedra.Polyhedron.load_from_json(src_path)
 
@@ -10,6 +13,3 @@ def main(src_path):
 		theta = polyhedra.dihedral_angle(f1, f2)
 		theta = numpy.degrees(theta)
 		print("{:<10}: {:>9.4f}°".format(str(f1.edge_id), theta))
-
-
-main(*sys.argv[1:])
@@ -0,0 +1,64 @@
+import os, sys, itertools, importlib.util
+from lib import util, trace, session, cache, make
+
+
+def _write_output(path, data : bytes):
+	if path == '-':
+		sys.stdout.buffer.write(data)
+		sys.stdout.buffer.flush()
+	else:
+		util.write_file(path, data)
+
+
+@util.main(profile = False)
+def main(*args):
+	"""
+	Run several generators in a single process.
+	
+	Usage: python -m generate <generator> <input> <output> [<generator> <input> <output> ...]
+	
+	Each job is given as the name of a module in this package, the path to the input file and the path to the output file, which is replaced atomically, or `-` to write to standard output. Jobs for the same input file share the loaded polyhedron and the data derived from it. If GENERATOR_CACHE_DIR is set, jobs whose output file was generated from the same input and source code are skipped. If GENERATOR_PROFILE is set, each job is profiled separately and the profile is written next to its output file, named after the generator and the input file.
+	"""
+	
+	if len(args) % 3:
+		raise util.UserError('Expected a multiple of 3 arguments, but got {}.', len(args))
+	
+	jobs = list(zip(args[::3], args[1::3], args[2::3]))
+	modules = { }
+	
+	for generator_name, _, _ in jobs:
+		if generator_name not in modules:
+			if importlib.util.find_spec('generate.' + generator_name) is None:
+				raise util.UserError('Unknown generator: {}', generator_name)
+			
+			modules[generator_name] = importlib.import_module('generate.' + generator_name)
+	
+	manifest = cache.manifest()
+	
+	# Only the data for a single input file is kept at a time.
+	for src_path, input_jobs in itertools.groupby(sorted(jobs, key = lambda x: x[1]), lambda x: x[1]):
+		input_session = session.Session()
+		name, _ = os.path.splitext(os.path.basename(src_path))
+		
+		for generator_name, _, output_path in input_jobs:
+			module = modules[generator_name]
+			key = manifest.job_key(module, src_path)
+			
+			if output_path != '-':
+				make.write_generator_dependencies(output_path, module, src_path)
+				
+				# Output written to standard output is always generated.
+				if manifest.is_current(output_path, key):
+					# Mark the file as up to date for make, which compares it to its dependencies.
+					os.utime(output_path)
+					
+					continue
+			
+			file = util.output_file()
+			
+			with util.profiling(generator_name, src_path, output_path), trace.trace_context(generator = generator_name, input = name):
+				module.generate(file, src_path, input_session)
+			
+			data = util.get_output_data(file)
+			_write_output(output_path, data)
+			manifest.record(output_path, key, data)
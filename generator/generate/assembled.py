@@ -1,41 +1,45 @@
-import sys, numpy
-from lib import polyhedra, tenon, export, util
+import sys, os
+from lib import polyhedra, tenon, export, util, trace, dependencies, cache, session, mesh
+
+
+numpy = util.lazy_import('numpy')
+
+
+# Both are in mm.
+scale = 20
+thickness = 1
+
+# Gap size for visualization
+gap = 0.005
+
+
+def generate(output_file, src_path, session : session.Session):
+	polyhedron = session.polyhedron(src_path, scale = scale)
+	graph = dependencies.DependencyGraph(polyhedron)
+	ten = tenon.RegularFingerTenon(thickness, stellation = session.stellation(polyhedron))
+	
+	with cache.face_cache('assembled', src_path, sys.modules[__name__]) as face_cache:
+		cuts = []
+		
+		for i in polyhedron.faces:
+			with trace.trace_context(face = i.face_id):
+				cuts.append(face_cache.get(graph.face_key(i, thickness), lambda: ten.tenon(i)))
+	
+	panels = []
+	
+	for face, cut in zip(polyhedron.faces, cuts):
+		with trace.trace_context(face = face.face_id):
+			prism = mesh.extrude(cut.offset(-gap / 2, 'round').simplify(0.001), thickness - gap)
+			panels.append(mesh.transform(prism, polyhedra.face_coordinate_system(face)))
+	
+	name, _ = os.path.splitext(os.path.basename(src_path))
+	
+	# The STL file is written directly, so that OpenSCAD does not need to extrude and render the panels.
+	output_file.flush()
+	export.write_stl(output_file.buffer, numpy.concatenate(panels), name)
+
 
 @util.main
+@trace.traced('assembled')
 def main(src_path):
-	file = export.OpenSCADFile(sys.stdout)
-
-	# Both are in mm.
-	scale = 20
-	thickness = 1
-
-	# Gap size for visualization
-	gap = 0.005
-
-	polyhedron = polyhedra.Polyhedron.load_from_json(src_path, scale = scale)
-	ten = tenon.RegularFingerTenon(thickness)
-
-	with file.group('render'):
-		for face in polyhedron.faces:
-			cut = ten.tenon(face)
-			t = polyhedra.face_coordinate_system(face)
-
-			polygon = polyhedra.get_planar_polygon(face)
-			vertices = polygon.paths[0].vertices
-			center = -numpy.mean(vertices, 0)
-			minr = numpy.amin([numpy.linalg.norm(v - center) for v in vertices])
-
-			with file.group('multmatrix', t):
-				with file.group('difference'):
-					with file.group('linear_extrude', thickness - gap):
-						with file.group('offset', -gap / 2):
-							file.polygon(cut)
-
-					with file.group('translate', [-center[0], -center[1], 0.7 * thickness]):
-						with file.group('linear_extrude', thickness):
-							fid = str(face.face_id)
-
-							if all(i in '0689' for i in fid):
-								fid += '.'
-
-							file.text(fid, size=0.3 * minr, halign='center', valign='center')
+	generate(sys.stdout, src_path, session.Session())
@@ -1,5 +1,8 @@
-import sys, math, numpy
-from lib import polyhedra, stellations, export, util, paths
+import sys, math
+from lib import polyhedra, export, util, paths, trace, dependencies, cache, session
+
+
+numpy = util.lazy_import('numpy')
 
 
 def arrange_grid(count):
@@ -8,27 +11,44 @@ def arrange_grid(count):
 	return [divmod(i, width) for i in range(count)]
 
 
-@util.main
-def main(src_path):
-	file = export.AsymptoteFile(sys.stdout)
+def generate(output_file, src_path, session : session.Session):
+	file = export.AsymptoteFile(output_file, simplify_tolerance = 0.001)
 	file.write('import "../_faces.asy" as _;')
 	
 	# Both are in mm.
 	scale = 20
 	spacing = 100
 
-	polyhedron = polyhedra.Polyhedron.load_from_json(src_path, scale)
-	stellation = stellations.Stellation()
-	boundary = paths.scale(spacing / 2) * paths.circle()
+	polyhedron = session.polyhedron(src_path, scale)
+	graph = dependencies.DependencyGraph(polyhedron)
+	stellation = session.stellation(polyhedron)
+	boundary = paths.scale(spacing / 2) * paths.circle(tolerance = 0.05)
 
-	for face, grid_pos in zip(polyhedron.faces, arrange_grid(len(polyhedron.faces))):
+	def get_facets(face):
+		polygon = polyhedra.get_planar_polygon(face)
+		offset = -numpy.mean(polygon.paths[0].vertices, 0)
+		
+		return paths.move(*offset) * stellation.stellation(face) & boundary
+	
+	with cache.face_cache('faces', src_path, sys.modules[__name__]) as face_cache:
+		all_facets = []
+		
+		for i in polyhedron.faces:
+			with trace.trace_context(face = i.face_id):
+				all_facets.append(face_cache.get(graph.face_key(i, spacing), lambda: get_facets(i)))
+	
+	for face, facets, grid_pos in zip(polyhedron.faces, all_facets, arrange_grid(len(polyhedron.faces))):
 		polygon = polyhedra.get_planar_polygon(face)
 		offset = -numpy.mean(polygon.paths[0].vertices, 0)
-		facets = stellation.stellation(face)
 		
 		polygon = paths.move(*offset) * polygon
-		facets = paths.move(*offset) * facets
 		
-		with file.transform('shift({} * {})', grid_pos, spacing):
-			file.write('face({});', facets & boundary)
+		with file.transform('shift({} * {})', grid_pos, spacing), trace.trace_context(face = face.face_id):
+			file.write('face({});', facets)
 			file.write('face({});', polygon)
+
+
+@util.main
+@trace.traced('faces')
+def main(src_path):
+	generate(sys.stdout, src_path, session.Session())
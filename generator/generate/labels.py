@@ -0,0 +1,42 @@
+import sys, os
+from lib import polyhedra, export, util, session
+from . import assembled
+
+
+numpy = util.lazy_import('numpy')
+
+
+def generate(output_file, src_path, session : session.Session):
+	"""
+	Write an OpenSCAD file which engraves the face IDs into the panels of the STL file written by the `assembled` generator. Evaluating the difference is slow, which is why the labels are not part of that STL file.
+	"""
+	
+	file = export.OpenSCADFile(output_file)
+	polyhedron = session.polyhedron(src_path, scale = assembled.scale)
+	name, _ = os.path.splitext(os.path.basename(src_path))
+	
+	with file.group('difference'):
+		file.call('import', '{}.stl'.format(name))
+		
+		for face in polyhedron.faces:
+			t = polyhedra.face_coordinate_system(face)
+			
+			vertices = polyhedra.get_planar_polygon(face).paths[0].m[:2].T
+			
+			# The label is centered on the mean of the vertices, not on the centroid of the area, which is the same for the regular faces used here.
+			center = numpy.mean(vertices, 0)
+			minr = numpy.amin(numpy.linalg.norm(vertices - center, axis = 1))
+			
+			with file.group('multmatrix', t), file.group('translate', [center[0], center[1], 0.7 * assembled.thickness]):
+				with file.group('linear_extrude', assembled.thickness):
+					fid = str(face.face_id)
+					
+					if all(i in '0689' for i in fid):
+						fid += '.'
+					
+					file.text(fid, size=0.3 * minr, halign='center', valign='center')
+
+
+@util.main
+def main(src_path):
+	generate(sys.stdout, src_path, session.Session())
@@ -1,19 +1,17 @@
 import sys
-from lib import polyhedra, util, export
+from lib import polyhedra, util, export, session, solids
 
 
-@util.main
-def main(src_path):
-	polyhedron = polyhedra.Polyhedron.load_from_json(src_path)
+def generate(output_file, src_path, session : session.Session):
+	polyhedron = session.polyhedron(src_path)
 	
-	file = export.OpenSCADFile(sys.stdout)
-	file.line('use <../_util.scad>')
+	# The model is the intersection of the half-spaces below the planes of all faces.
+	solid = solids.intersect_half_spaces((i.vertex_coordinate, polyhedra.view_local_onb(i)[2]) for i in polyhedron.faces)
 	
-	with file.group('render'):
-		with file.group('intersection'):
-			for i in polyhedron.faces:
-				t = polyhedra.face_coordinate_system(i)
-				
-				with file.group('multmatrix', t):
-					with file.group('scale', [1, 1, -1]):
-						file.call('half_space')
+	file = export.OpenSCADFile(output_file)
+	file.polyhedron(solid)
+
+
+@util.main
+def main(src_path):
+	generate(sys.stdout, src_path, session.Session())
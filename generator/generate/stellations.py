@@ -1,21 +1,28 @@
 import sys
-from lib import polyhedra, util, export
+from lib import polyhedra, util, export, session, solids
 
 
-@util.main
-def main(src_path):
-	polyhedron = polyhedra.Polyhedron.load_from_json(src_path)
+def generate(output_file, src_path, session : session.Session):
+	polyhedron = session.polyhedron(src_path)
+	cells = []
 	
-	file = export.OpenSCADFile(sys.stdout)
-	file.line('use <../_util.scad>')
+	for i in polyhedron.faces:
+		# The cell above each face is bounded by the planes of the neighbouring faces.
+		half_spaces = [(i.vertex_coordinate, -polyhedra.view_local_onb(i)[2])]
+		half_spaces.extend((j.opposite.vertex_coordinate, polyhedra.view_local_onb(j.opposite)[2]) for j in i.face_cycle)
+		cell = solids.intersect_half_spaces(half_spaces)
+		
+		if cell is not None:
+			cells.append(cell)
 	
+	file = export.OpenSCADFile(output_file)
+	
+	# Each cell is written as a separate polyhedron, as cells share edges with more than one other cell, which cannot be represented by a single manifold mesh.
 	with file.group('render'):
-		for i in polyhedron.faces:
-			with file.group('intersection'):
-				with file.group('multmatrix', polyhedra.face_coordinate_system(i)):
-					file.call('half_space')
-				
-				for j in i.face_cycle:
-					with file.group('multmatrix', polyhedra.face_coordinate_system(j.opposite)):
-						with file.group('scale', [1, 1, -1]):
-							file.call('half_space')
+		for i in cells:
+			file.polyhedron(i)
+
+
+@util.main
+def main(src_path):
+	generate(sys.stdout, src_path, session.Session())
@@ -1,5 +1,8 @@
-import sys, math, numpy
-from lib import polyhedra, tenon, export, util, paths
+import sys, math
+from lib import polyhedra, tenon, export, util, paths, trace, dependencies, cache, session
+
+
+numpy = util.lazy_import('numpy')
 
 
 def arrange_grid(count):
@@ -8,9 +11,8 @@ def arrange_grid(count):
 	return [divmod(i, width) for i in range(count)]
 
 
-@util.main
-def main(src_path):
-	file = export.AsymptoteFile(sys.stdout)
+def generate(output_file, src_path, session : session.Session):
+	file = export.AsymptoteFile(output_file, simplify_tolerance = 0.001)
 	file.write('import "../_faces.asy" as _;')
 	file.write('unitsize(mm);')
 	
@@ -18,20 +20,36 @@ def main(src_path):
 	scale = 20
 	spacing = 100
 	
-	polyhedron = polyhedra.Polyhedron.load_from_json(src_path, scale = scale)
-	fingertenon = tenon.RegularFingerTenon(4)
+	thickness = 4
+	finger_count = 8
+	
+	# Width of the material removed by the laser cutter. The cut contour is moved outwards by half of it.
+	kerf = 0
+	
+	polyhedron = session.polyhedron(src_path, scale = scale)
+	graph = dependencies.DependencyGraph(polyhedron)
+	fingertenon = tenon.RegularFingerTenon(thickness, finger_count, session.stellation(polyhedron))
 	
 	debug_mode = True
 	
-	for face, grid_pos in zip(polyhedron.faces, arrange_grid(len(polyhedron.faces))):
+	with cache.face_cache('tenons', src_path, sys.modules[__name__]) as face_cache:
+		cuts = []
+		
+		for i in polyhedron.faces:
+			with trace.trace_context(face = i.face_id):
+				cuts.append(face_cache.get(graph.face_key(i, thickness, finger_count), lambda: fingertenon.tenon(i)))
+	
+	for face, cut, grid_pos in zip(polyhedron.faces, cuts, arrange_grid(len(polyhedron.faces))):
 		polygon = polyhedra.get_planar_polygon(face)
 		offset = -numpy.mean(polygon.paths[0].vertices, 0)
-		cut = fingertenon.tenon(face)
 		
 		polygon = paths.move(*offset) * polygon
 		cut = paths.move(*offset) * cut
 		
-		with file.transform('shift({} * {})', grid_pos, spacing):
+		if kerf:
+			cut = cut.offset(kerf / 2)
+		
+		with file.transform('shift({} * {})', grid_pos, spacing), trace.trace_context(face = face.face_id):
 			if debug_mode:
 				file.write('face({});', cut)
 				file.write('edges({});', polygon)
@@ -49,3 +67,9 @@ def main(src_path):
 
 			# Contour for laser cut
 			file.write('cut_contour({});', cut)
+
+
+@util.main
+@trace.traced('tenons')
+def main(src_path):
+	generate(sys.stdout, src_path, session.Session())
@@ -0,0 +1,204 @@
+import os, json, types, hashlib, contextlib
+from . import paths, make, util
+
+
+numpy = util.lazy_import('numpy')
+pickle = util.lazy_import('pickle')
+
+
+# Name of the environment variable which selects the directory persisted results are stored in. Results are not persisted if the variable is not set.
+cache_dir_variable = 'GENERATOR_CACHE_DIR'
+
+
+def source_digest(*modules):
+	"""
+	Return a hash over the source code of the specified modules.
+	"""
+	
+	hash = hashlib.sha256()
+	
+	for i in modules:
+		hash.update(util.read_file(i.__file__))
+	
+	return hash.hexdigest()
+
+
+class FaceCache:
+	"""
+	Store for polygons computed per face which can be persisted between runs of a generator.
+	
+	Entries are identified by keys like the ones returned by `dependencies.DependencyGraph.face_key()`. Entries which were not used while the cache was open are dropped when it is saved.
+	"""
+	
+	def __init__(self, entries = None):
+		self._entries = entries
+		self._used_entries = { }
+	
+	@property
+	def enabled(self):
+		"""
+		Whether results are stored at all.
+		"""
+		
+		return self._entries is not None
+	
+	def get(self, key, fn):
+		"""
+		Return the polygon stored under the specified key. If there is no such entry, call `fn` to compute the polygon and store it.
+		
+		If the cache is enabled, the polygon is evaluated and the result is returned as a concrete polygon so that results taken from the cache and freshly computed ones can be used interchangeably.
+		"""
+		
+		if not self.enabled:
+			return fn()
+		
+		entry = self._entries.get(key)
+		
+		if entry is None:
+			entry = [numpy.array(i.vertices) for i in fn().paths]
+		
+		self._used_entries[key] = entry
+		
+		return paths.polygon(*entry)
+	
+	@property
+	def hit_count(self):
+		"""
+		Number of entries which were used and had been loaded from a previous run.
+		"""
+		
+		return sum(1 for i in self._used_entries if i in self._entries)
+	
+	@property
+	def entries(self):
+		"""
+		The entries which were used since the cache was opened.
+		"""
+		
+		return self._used_entries
+
+
+class Manifest:
+	"""
+	Records for each generated file a hash over everything it was generated from and a hash of its content, so that generating it again can be skipped if none of the inputs changed, independent of the timestamps of the files.
+	
+	The entry of each generated file is stored in a separate file, so that jobs running concurrently do not overwrite each other's entries.
+	"""
+	
+	def __init__(self, dir_path = None):
+		self._dir_path = dir_path
+	
+	@property
+	def enabled(self):
+		"""
+		Whether outputs are recorded at all.
+		"""
+		
+		return self._dir_path is not None
+	
+	def _get_entry_path(self, output_path):
+		name = hashlib.sha256(os.path.abspath(output_path).encode()).hexdigest()
+		
+		return os.path.join(self._dir_path, name + '.json')
+	
+	def job_key(self, generator_module : types.ModuleType, src_path, *params):
+		"""
+		Return a hash over the content of the input file, the source code of the generator and all modules of the generator it imports and the specified additional parameters (which must have a stable `repr()`).
+		"""
+		
+		hash = hashlib.sha256()
+		hash.update(repr((generator_module.__name__, params)).encode())
+		hash.update(hashlib.sha256(util.read_file(src_path)).digest())
+		hash.update(source_digest(*make.get_imported_modules(generator_module)).encode())
+		
+		return hash.hexdigest()
+	
+	def is_current(self, output_path, key):
+		"""
+		Return whether the specified file exists, was generated with the specified key and was not modified since.
+		"""
+		
+		if not self.enabled:
+			return False
+		
+		entry_path = self._get_entry_path(output_path)
+		
+		if not os.path.exists(entry_path) or not os.path.exists(output_path):
+			return False
+		
+		try:
+			entry = json.loads(util.read_text_file(entry_path))
+		except ValueError as e:
+			util.log('Warning: Ignoring unreadable manifest entry {}: {}', entry_path, e)
+			
+			return False
+		
+		if entry['path'] != os.path.abspath(output_path) or entry['key'] != key:
+			return False
+		
+		return hashlib.sha256(util.read_file(output_path)).hexdigest() == entry['output']
+	
+	def record(self, output_path, key, data : bytes):
+		"""
+		Record that the specified data was generated with the specified key and written to the specified file.
+		"""
+		
+		if self.enabled:
+			entry = dict(path = os.path.abspath(output_path), key = key, output = hashlib.sha256(data).hexdigest())
+			util.write_text_file(self._get_entry_path(output_path), json.dumps(entry, indent = 2, sort_keys = True))
+
+
+def manifest():
+	"""
+	Return a Manifest instance which stores its entries in the directory `manifest` within the directory selected by the GENERATOR_CACHE_DIR environment variable.
+	"""
+	
+	cache_dir = os.environ.get(cache_dir_variable)
+	
+	if not cache_dir:
+		return Manifest()
+	
+	return Manifest(os.path.join(cache_dir, 'manifest'))
+
+
+def _get_cache_path(generator_name, src_path):
+	cache_dir = os.environ.get(cache_dir_variable)
+	
+	if not cache_dir:
+		return None
+	
+	name, _ = os.path.splitext(os.path.basename(src_path))
+	
+	return os.path.join(cache_dir, '{}-{}.pickle'.format(generator_name, name))
+
+
+@contextlib.contextmanager
+def face_cache(generator_name, src_path, generator_module : types.ModuleType):
+	"""
+	Context manager yielding a FaceCache instance which is loaded from and saved to a file in the directory selected by the GENERATOR_CACHE_DIR environment variable.
+	
+	The file is selected using the name of the generator and the name of the input file. The loaded entries are discarded if the source code of the generator module or of any other module of the generator it imports changed since they were saved, as the cached polygons can depend on both.
+	"""
+	
+	path = _get_cache_path(generator_name, src_path)
+	
+	if path is None:
+		yield FaceCache()
+	else:
+		digest = source_digest(*make.get_imported_modules(generator_module))
+		entries = { }
+		
+		if os.path.exists(path):
+			try:
+				saved_digest, saved_entries = pickle.loads(util.read_file(path))
+			except Exception as e:
+				util.log('Warning: Ignoring unreadable cache file {}: {}', path, e)
+			else:
+				if saved_digest == digest:
+					entries = saved_entries
+		
+		face_cache = FaceCache(entries)
+		
+		yield face_cache
+		
+		util.write_file(path, pickle.dumps((digest, face_cache.entries)))
@@ -0,0 +1,129 @@
+import hashlib
+from . import polyhedra, util
+
+
+numpy = util.lazy_import('numpy')
+
+
+class DependencyGraph:
+	"""
+	Records which vertices of a polyhedron the geometry derived for each of its faces, edges, stellation cones and tenons depends on.
+	
+	The dependencies are derived from the half-edge structure of the polyhedron:
+	
+	- A face depends on the vertices along its boundary.
+	- An edge depends on the vertices of both faces adjacent to it (the planar coordinates and the dihedral angle).
+	- The stellation cone over an edge of a face depends on that face, the face on the other side of the edge and all faces adjacent to that second face.
+	- The tenon and the stellation figure of a face depend on the face, its edges and the stellation cones over all its edges.
+	"""
+	
+	def __init__(self, polyhedron : polyhedra.Polyhedron):
+		self._polyhedron = polyhedron
+		
+		self._face_vertices = { i.face_id: frozenset(j.vertex_id for j in i.face_cycle) for i in polyhedron.faces }
+		self._edge_vertices = { i.edge_id: self._face_vertices[i.face_id] | self._face_vertices[i.opposite.face_id] for i in polyhedron.all_views }
+		self._cone_vertices = { i.edge_id: self._get_cone_vertices(i) for i in polyhedron.all_views }
+		self._tenon_vertices = { i.face_id: self._get_tenon_vertices(i) for i in polyhedron.faces }
+		
+		self._vertex_faces = self._invert(self._face_vertices)
+		self._vertex_edges = self._invert(self._edge_vertices)
+		self._vertex_cones = self._invert(self._cone_vertices)
+		self._vertex_tenons = self._invert(self._tenon_vertices)
+	
+	def _get_cone_vertices(self, view : polyhedra.PolyhedronView):
+		opposite = view.opposite
+		face_ids = [view.face_id, opposite.face_id] + [i.opposite.face_id for i in opposite.face_cycle]
+		
+		return frozenset(j for i in face_ids for j in self._face_vertices[i])
+	
+	def _get_tenon_vertices(self, view : polyhedra.PolyhedronView):
+		return frozenset(k for i in view.face_cycle for j in [self._edge_vertices[i.edge_id], self._cone_vertices[i.edge_id]] for k in j)
+	
+	@classmethod
+	def _invert(cls, dependencies):
+		res = { }
+		
+		for k, v in dependencies.items():
+			for i in v:
+				res.setdefault(i, set()).add(k)
+		
+		return res
+	
+	@property
+	def polyhedron(self):
+		"""
+		Returns the underlying polyhedron.
+		"""
+		
+		return self._polyhedron
+	
+	def face_vertices(self, view : polyhedra.PolyhedronView):
+		"""
+		The set of vertex identifiers the specified view's face depends on.
+		"""
+		
+		return self._face_vertices[view.face_id]
+	
+	def edge_vertices(self, view : polyhedra.PolyhedronView):
+		"""
+		The set of vertex identifiers the specified view's edge depends on.
+		"""
+		
+		return self._edge_vertices[view.edge_id]
+	
+	def cone_vertices(self, view : polyhedra.PolyhedronView):
+		"""
+		The set of vertex identifiers the stellation cone over the specified view's edge depends on.
+		"""
+		
+		return self._cone_vertices[view.edge_id]
+	
+	def tenon_vertices(self, view : polyhedra.PolyhedronView):
+		"""
+		The set of vertex identifiers the tenon and the stellation figure of the specified view's face depend on.
+		"""
+		
+		return self._tenon_vertices[view.face_id]
+	
+	def affected_faces(self, vertex_ids):
+		"""
+		Return the set of identifiers of the faces whose tenons or stellation figures change when any of the specified vertices are moved.
+		"""
+		
+		return set(j for i in vertex_ids for j in self._vertex_tenons.get(i, ()))
+	
+	def affected_edges(self, vertex_ids):
+		"""
+		Return the set of identifiers of the edges which change when any of the specified vertices are moved.
+		"""
+		
+		return set(j for i in vertex_ids for j in self._vertex_edges.get(i, ()))
+	
+	def affected_cones(self, vertex_ids):
+		"""
+		Return the set of identifiers of the edges whose stellation cones change when any of the specified vertices are moved.
+		"""
+		
+		return set(j for i in vertex_ids for j in self._vertex_cones.get(i, ()))
+	
+	def face_key(self, view : polyhedra.PolyhedronView, *params):
+		"""
+		Return a string which identifies all inputs the tenon and the stellation figure of the specified view's face are computed from.
+		
+		The key covers the coordinates of all vertices the face depends on, the topology of all faces containing those vertices and the specified additional parameters (which must have a stable `repr()`). Two faces with the same key produce the same result.
+		"""
+		
+		vertex_ids = sorted(self.tenon_vertices(view))
+		face_ids = sorted(set(j for i in vertex_ids for j in self._vertex_faces[i]))
+		hash = hashlib.sha256()
+		
+		hash.update(repr((view.face_id, view.vertex_id, params)).encode())
+		
+		for i in face_ids:
+			hash.update(repr((i, [j.vertex_id for j in self._polyhedron.faces[i].face_cycle])).encode())
+		
+		for i in vertex_ids:
+			hash.update(repr(i).encode())
+			hash.update(numpy.asarray(self._polyhedron.vertex_coordinate(i), numpy.float64).tobytes())
+		
+		return hash.hexdigest()
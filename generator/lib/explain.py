@@ -0,0 +1,92 @@
+from __future__ import annotations
+import json
+from . import paths
+
+
+def get_nodes(root : paths.Polygon):
+	"""
+	Return a list of dicts describing the nodes of the expression of a polygon in depth-first order. Each node is listed once and refers to its children by their index in the list.
+	"""
+	
+	polygons = []
+	ids = { }
+	parent_counts = { }
+	
+	def visit(polygon):
+		ids[id(polygon)] = len(polygons)
+		polygons.append(polygon)
+		
+		for i in polygon._get_children():
+			parent_counts[id(i)] = parent_counts.get(id(i), 0) + 1
+			
+			if id(i) not in ids:
+				visit(i)
+	
+	visit(root)
+	
+	def get_node(polygon):
+		measurement = polygon._measurement
+		
+		return dict(
+			id = ids[id(polygon)],
+			type = polygon._get_label(),
+			shared = parent_counts.get(id(polygon), 0) > 1,
+			bounded = bool(polygon._bounded),
+			estimated_vertices = int(polygon._vertex_estimate),
+			measured_vertices = None if measurement is None else measurement.vertex_count,
+			evaluations = 0 if measurement is None else measurement.evaluation_count,
+			time = 0.0 if measurement is None else measurement.time,
+			children = [ids[id(i)] for i in polygon._get_children()])
+	
+	return [get_node(i) for i in polygons]
+
+
+def _describe_node(node):
+	flags = [i for i in ['shared', 'bounded'] if node[i]]
+	description = '#{} {}'.format(node['id'], node['type'])
+	
+	if flags:
+		description += ' [{}]'.format(', '.join(flags))
+	
+	description += ', estimated {} vertices'.format(node['estimated_vertices'])
+	
+	if node['evaluations']:
+		description += ', measured {} vertices, {} evaluations, {:.3f} ms'.format(node['measured_vertices'], node['evaluations'], node['time'] * 1000)
+	
+	return description
+
+
+def format_text(nodes):
+	lines = []
+	visited = set()
+	
+	def visit(node, depth):
+		indent = '  ' * depth
+		
+		if node['id'] in visited:
+			lines.append('{}#{} (see above)'.format(indent, node['id']))
+		else:
+			visited.add(node['id'])
+			lines.append(indent + _describe_node(node))
+			
+			for i in node['children']:
+				visit(nodes[i], depth + 1)
+	
+	visit(nodes[0], 0)
+	
+	return '\n'.join(lines)
+
+
+def format_dot(nodes):
+	lines = ['digraph polygon {', '\tnode [shape = box];']
+	
+	for i in nodes:
+		style = ', style = bold' if i['shared'] else ''
+		lines.append('\tn{} [label = {}{}];'.format(i['id'], json.dumps(_describe_node(i)), style))
+		
+		for j in i['children']:
+			lines.append('\tn{} -> n{};'.format(i['id'], j))
+	
+	lines.append('}')
+	
+	return '\n'.join(lines)
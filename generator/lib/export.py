@@ -1,5 +1,8 @@
-import numpy, abc, itertools, io, contextlib, json
-from . import paths, util
+import abc, itertools, io, contextlib, json
+from . import paths, solids, util
+
+
+numpy = util.lazy_import('numpy')
 
 
 class File:
@@ -7,20 +10,45 @@ class File:
 	Context manager which yields a File instance. The statements written to that instance are written to a file at the specified path.
 	"""
 	
-	def __init__(self, file : io.TextIOBase):
+	def __init__(self, file : io.TextIOBase, *, simplify_tolerance = None):
+		"""
+		:param simplify_tolerance: If set, polygons with vertices approximating curves, like circles and round offsets, are simplified using `paths.Polygon.simplify()` with this tolerance before they are written. From the paths of other polygons, only vertices which are (nearly) duplicates of their neighbors or (nearly) collinear with them are removed, which saves the additional Clipper operation per polygon needed by `paths.Polygon.simplify()`.
+		"""
+		
 		self.file = file
 		self.variable_id_iter = itertools.count()
+		self.simplify_tolerance = simplify_tolerance
 	
 	def _write_line(self, line : str):
 		print(line, file = self.file)
 	
+	@util.stage('compute')
+	def _get_polygon_paths(self, polygon : paths.Polygon):
+		simplify_paths = False
+		
+		if self.simplify_tolerance is not None:
+			if polygon._approximated:
+				polygon = polygon.simplify(self.simplify_tolerance)
+			else:
+				simplify_paths = True
+		
+		# Outer boundaries are followed by the holes within them and oriented accordingly, so that the result is independent of the fill rule.
+		res = [j for i in polygon.components for j in i]
+		
+		if simplify_paths:
+			res = _simplify_paths(res, self.simplify_tolerance)
+		
+		util.count('output_vertices', sum(i.m.shape[1] for i in res))
+		
+		return res
+	
 	def get_variable_name(self):
 		return '_var_{}'.format(next(self.variable_id_iter))
 
 
 class AsymptoteFile(File):
-	def __init__(self, *args):
-		super().__init__(*args)
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
 		
 		self._picture_stack_id_iter = itertools.count()
 	
@@ -62,7 +90,7 @@ class AsymptoteFile(File):
 		if isinstance(value, paths.Path):
 			return self._serialize_path(value, closed = close_paths)
 		elif isinstance(value, paths.Polygon):
-			return self._serialize_array('path', value.paths, 1, True)
+			return self._serialize_array('path', self._get_polygon_paths(value), 1, True)
 		elif isinstance(value, tuple):
 			return '({})'.format(', '.join(map(self._serialize_length, value)))
 		else:
@@ -72,6 +100,7 @@ class AsymptoteFile(File):
 	def _format_expression(self, expression, *args):
 		return expression.format(*[self._serialize_value(i, False) for i in args])
 	
+	@util.stage('export')
 	def declare_array(self, type, elements, depth = 1):
 		return self._serialize_array(type, elements, depth, False)
 	
@@ -90,6 +119,7 @@ class AsymptoteFile(File):
 		self.write('add({}, {} * currentpicture);', saved_name, transform_name)
 		self.write('currentpicture = {};', saved_name)
 	
+	@util.stage('export')
 	def write(self, statement, *args):
 		"""
 		Write a statement to the file.
@@ -106,11 +136,12 @@ class AsymptoteFile(File):
 
 
 class OpenSCADFile(File):
-	def __init__(self, *args):
-		super().__init__(*args)
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
 		
 		self._indentation_level = 0
 	
+	@util.stage('export')
 	def line(self, line, *args):
 		self._write_line('\t' * self._indentation_level + line.format(*args))
 	
@@ -124,9 +155,11 @@ class OpenSCADFile(File):
 		self._indentation_level -= 1
 		self.line('}}')
 	
+	@util.stage('export')
 	def call(self, module, *args, **kwargs):
 		self.line('{};', self._format_call(module, args, kwargs))
 	
+	@util.stage('export')
 	def polygon(self, polygon : paths.Polygon):
 		vertices = []
 		
@@ -137,13 +170,26 @@ class OpenSCADFile(File):
 			
 			return index
 		
-		paths = [[save_vertex(j) for j in i.vertices] for i in polygon.paths]
+		paths = [[save_vertex(j) for j in i.vertices] for i in self._get_polygon_paths(polygon)]
 		
 		self.call('polygon', vertices, paths)
-
+	
+	@util.stage('export')
+	def polyhedron(self, solid : solids.ConvexSolid):
+		"""
+		Write the specified `solids.ConvexSolid` instance as a polyhedron.
+		"""
+		
+		points, faces = solids.get_mesh(solid)
+		util.count('output_vertices', len(points))
+		
+		# OpenSCAD expects the vertices of each face in clockwise order when viewed from outside.
+		self.call('polyhedron', points = points, faces = [i[::-1] for i in faces])
+	
+	@util.stage('export')
 	def text(self, string : str, size = 1.0, font = 'Liberation Sans', **kwargs):
 		self.call('text', string, font=font, size=size, **kwargs)
-
+	
 	@classmethod
 	def _serialize_expression(cls, expression):
 		if isinstance(expression, (int, float, numpy.number)):
@@ -160,16 +206,40 @@ class OpenSCADFile(File):
 		return '{}({})'.format(module, ', '.join([cls._serialize_expression(i) for i in args] + ['{} = {}'.format(k, cls._serialize_expression(v)) for k, v in kwargs.items()]))
 
 
+@util.stage('export')
+def write_stl(file : io.BufferedIOBase, mesh, name = ''):
+	"""
+	Write a mesh, given as an array of shape (n, 3, 3) as returned by the functions in `lib.mesh`, to the specified binary file as a binary STL file.
+	
+	:param name: Written to the header of the file.
+	"""
+	
+	# Binary STL files must not start with `solid`, which would make them look like an ASCII STL file.
+	header = 'binary {}'.format(name).encode()[:80].ljust(80, b'\0')
+	
+	normals = numpy.cross(mesh[:, 1] - mesh[:, 0], mesh[:, 2] - mesh[:, 0])
+	lengths = numpy.linalg.norm(normals, axis = 1)
+	
+	triangles = numpy.zeros(len(mesh), numpy.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attributes', '<u2')]))
+	triangles['normal'] = normals / numpy.where(lengths > 0, lengths, 1)[:, numpy.newaxis]
+	triangles['vertices'] = mesh
+	util.count('output_vertices', 3 * len(mesh))
+	
+	file.write(header)
+	file.write(numpy.array([len(mesh)], '<u4').tobytes())
+	file.write(triangles.tobytes())
+
+
 @contextlib.contextmanager
-def writing_asymptote_file(path):
+def writing_asymptote_file(path, **kwargs):
 	with util.writing_text_file(path) as file:
-		yield AsymptoteFile(file)
+		yield AsymptoteFile(file, **kwargs)
 
 
 @contextlib.contextmanager
-def writing_open_scad_file(path):
+def writing_open_scad_file(path, **kwargs):
 	with util.writing_text_file(path) as file:
-		yield OpenSCADFile(file)
+		yield OpenSCADFile(file, **kwargs)
 
 
 def _group(iterable, count):
@@ -185,3 +255,35 @@ def _group(iterable, count):
 	
 	if accu:
 		yield accu
+
+
+def _simplify_paths(paths_list, tolerance):
+	"""
+	Return the closed paths with vertices removed which are within the specified tolerance of the edge replacing them. Unlike `paths.Polygon.simplify()`, this does not resolve the self-intersections this may cause, which can only be as deep as the tolerance and do not matter for drawing the paths.
+	"""
+	
+	if not paths_list:
+		return paths_list
+	
+	# Most paths have no vertex within the tolerance of the line through its neighbors. These are found for all paths at once and are kept unchanged.
+	lengths = numpy.array([i.m.shape[1] for i in paths_list])
+	starts = numpy.cumsum(lengths) - lengths
+	vertices = numpy.concatenate([i.m[:2].T for i in paths_list])
+	path_starts = numpy.repeat(starts, lengths)
+	path_lengths = numpy.repeat(lengths, lengths)
+	offsets = numpy.arange(len(vertices)) - path_starts
+	a = vertices[path_starts + (offsets - 1) % path_lengths]
+	d = vertices[path_starts + (offsets + 1) % path_lengths] - a
+	v = vertices - a
+	near = numpy.abs(d[:, 0] * v[:, 1] - d[:, 1] * v[:, 0]) <= tolerance * numpy.hypot(d[:, 0], d[:, 1])
+	simplifiable = numpy.logical_or.reduceat(near, starts) & (lengths > 3)
+	
+	def simplify_path(path):
+		keep = paths._SimplifiedPolygon._simplify_ring(path.m[:2].T, tolerance)
+		
+		if len(keep) < 3:
+			return path
+		
+		return paths.Path(path.m[:, keep])
+	
+	return [simplify_path(i) if j else i for i, j in zip(paths_list, simplifiable)]
@@ -1,10 +1,14 @@
-import numpy
-import numpy.linalg
+from . import util
+
+
+numpy = util.lazy_import('numpy')
+
 
 parallel_eps = 1e-10
 
 
-norm = numpy.linalg.norm
+def norm(v):
+	return numpy.linalg.norm(v)
 
 
 def normalize(v):
@@ -0,0 +1,57 @@
+import os, sys, types
+from . import util
+
+
+# Directory containing the `lib` package and the other packages of the generator.
+_root_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _is_generator_module(name):
+	"""
+	Return whether the module with the specified name is part of the generator, i.e. whether its top-level package is located in the directory containing the `lib` package.
+	"""
+	
+	top_level = os.path.join(_root_path, name.partition('.')[0])
+	
+	return os.path.isdir(top_level) or os.path.isfile(top_level + '.py')
+
+
+def get_imported_modules(module : types.ModuleType):
+	"""
+	Return the specified module and all modules of the generator it imports, directly or indirectly, like the modules of the `lib` package and other generators.
+	"""
+	
+	# Names are looked up in sys.modules because accessing any attribute of a module returned by `util.lazy_import()` loads it.
+	names = { id(v): k for k, v in sys.modules.items() }
+	modules = { module.__name__: module }
+	stack = [module]
+	
+	while stack:
+		for i in vars(stack.pop()).values():
+			name = names.get(id(i))
+			
+			if isinstance(i, types.ModuleType) and name is not None and name not in modules and _is_generator_module(name):
+				modules[name] = i
+				stack.append(i)
+	
+	return [v for k, v in sorted(modules.items())]
+
+
+def write_dependencies(path, target, dependencies):
+	"""
+	Write a makefile to the specified path declaring that the specified target depends on the specified files.
+	
+	Each dependency also gets a rule without prerequisites so that make does not fail when one of them is removed.
+	"""
+	
+	lines = ['{}: {}'.format(target, ' '.join(dependencies))] + ['{}:'.format(i) for i in dependencies]
+	util.write_text_file(path, ''.join(i + '\n' for i in lines))
+
+
+def write_generator_dependencies(output_path, generator_module : types.ModuleType, src_path):
+	"""
+	Write the file `<output_path>.d` declaring that the output of a generator depends on its input file and the source code of the generator and all modules of the generator it imports.
+	"""
+	
+	dependencies = [os.path.relpath(src_path)] + [os.path.relpath(i.__file__) for i in get_imported_modules(generator_module)]
+	write_dependencies(output_path + '.d', output_path, dependencies)
@@ -0,0 +1,261 @@
+"""
+Triangle meshes of extruded polygons, which are computed in Python instead of by extruding and combining polygons in OpenSCAD.
+
+A mesh is represented by an array of shape (n, 3, 3) containing the coordinates of the vertices of n triangles. The vertices of each triangle are ordered counter-clockwise when viewed from outside of the solid.
+"""
+
+from . import paths, util
+
+
+numpy = util.lazy_import('numpy')
+
+
+# Sine of the angle below which three vertices are considered collinear. The vertices are rounded to the integer coordinates used by clipper, so collinear vertices are only approximately collinear.
+collinear_eps = 1e-9
+
+
+def _cross(u, v):
+	"""
+	Return the z component of the cross products of two arrays of 2D vectors.
+	"""
+	
+	return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def _get_repeated(ring):
+	"""
+	Return a boolean array which is true for each vertex of the ring, given as an array of indices into points, which occurs more than once in the ring. Points with the same coordinates are expected to have the same index.
+	"""
+	
+	return numpy.bincount(ring)[ring] > 1
+
+
+def _find_ears(points, ring):
+	"""
+	Return a boolean array which is true for each vertex of the ring, given as an array of indices into points, which can be cut off as a triangle, without the triangle containing any other vertex of the ring.
+	"""
+	
+	a = points[numpy.roll(ring, 1)]
+	b = points[ring]
+	c = points[numpy.roll(ring, -1)]
+	
+	cross = _cross(b - a, c - b)
+	
+	# The tips of spikes, where the boundary turns back on itself, and vertices which coincide with a neighbor enclose no area and are cut off first. A remaining spike can make a triangle at a vertex next to it cover area outside of the polygon. Vertices where the boundary continues straight are kept, as another vertex may touch them.
+	collinear = numpy.abs(cross) <= collinear_eps * numpy.linalg.norm(b - a, axis = 1) * numpy.linalg.norm(c - b, axis = 1)
+	degenerate = collinear & (numpy.sum((b - a) * (c - b), axis = 1) <= 0)
+	
+	if degenerate.any():
+		return degenerate
+	
+	convex = cross > 0
+	candidates = numpy.flatnonzero(convex)
+	ears = numpy.zeros(len(ring), bool)
+	
+	if not len(candidates):
+		return ears
+	
+	# Matrices of the candidates by the other vertices. A triangle which contains any vertex of the ring also contains a reflex vertex.
+	p = points[ring[~convex]][numpy.newaxis]
+	a, b, c = [i[candidates, numpy.newaxis] for i in [a, b, c]]
+	inside = (_cross(b - a, p - a) >= 0) & (_cross(c - b, p - b) >= 0) & (_cross(a - c, p - c) >= 0)
+	
+	# Vertices which coincide with a vertex of the triangle, like the ones duplicated by bridging a hole, do not prevent cutting it off.
+	for i in [a, b, c]:
+		inside &= numpy.any(p != i, axis = 2)
+	
+	ears[candidates] = ~numpy.any(inside, axis = 1)
+	
+	# A vertex which occurs more than once, like the ends of bridges and vertices where holes touch the boundary, prevents cutting off a triangle at one of its occurrences if an edge at another occurrence enters the triangle.
+	coordinates = points[ring]
+	corners = [i[:, 0] for i in [a, b, c]]
+	repeated = _get_repeated(ring)
+	
+	for i in numpy.flatnonzero(repeated):
+		v = coordinates[i]
+		edges = [coordinates[i - 1] - v, coordinates[(i + 1) % len(ring)] - v]
+		
+		for x, y, z in [corners, corners[1:] + corners[:1], corners[2:] + corners[:2]]:
+			at_corner = numpy.all(x == v, axis = 1)
+			
+			for d in edges:
+				ears[candidates] &= ~(at_corner & (_cross(y - x, d) > 0) & (_cross(d, z - x) > 0))
+	
+	# Edges which coincide with an edge at another occurrence of a vertex may belong to a bridge, with the interior of the polygon on both sides, or to a passage of zero width between two parts of the polygon, with the interior on neither side. Which is the case is decided by the winding number of the ring around the triangle.
+	at_repeated = (repeated | numpy.roll(repeated, 1) | numpy.roll(repeated, -1))[candidates]
+	
+	if numpy.any(at_repeated & ears[candidates]):
+		centroids = numpy.mean(corners, axis = 0)[at_repeated, numpy.newaxis]
+		p, q = coordinates, numpy.roll(coordinates, -1, axis = 0)
+		side = _cross(q - p, centroids - p)
+		upward = (p[:, 1] <= centroids[..., 1]) & (q[:, 1] > centroids[..., 1]) & (side > 0)
+		downward = (q[:, 1] <= centroids[..., 1]) & (p[:, 1] > centroids[..., 1]) & (side < 0)
+		ears[candidates[at_repeated]] &= numpy.sum(upward, axis = 1) - numpy.sum(downward, axis = 1) == 1
+	
+	return ears
+
+
+def _triangulate_ring(points, ring):
+	"""
+	Triangulate a simple polygon given as an array of indices into points, ordered counter-clockwise, using ear clipping. Returns an array of shape (n, 3) of indices.
+	
+	In each step, all ears which are not adjacent to each other are cut off at once. The ring may touch itself at vertices which occur more than once, like the ends of bridges.
+	"""
+	
+	triangles = []
+	
+	while len(ring) > 3:
+		ears = _find_ears(points, ring)
+		
+		if ears.all():
+			# Happens for convex polygons. Choose every other vertex, except the last, if it is adjacent to the first.
+			chosen = numpy.arange(len(ring)) % 2 == 0
+			chosen[-1] = False
+		elif ears.any():
+			# Choose every other ear of each run of adjacent ears. The ring is rotated so that no run wraps around its end.
+			shift = numpy.argmin(ears)
+			rolled = numpy.roll(ears, -shift)
+			indices = numpy.arange(len(ring))
+			run_starts = numpy.maximum.accumulate(numpy.where(rolled & ~numpy.roll(rolled, 1), indices, 0))
+			chosen = numpy.roll(rolled & ((indices - run_starts) % 2 == 0), shift)
+		else:
+			# Can only happen for degenerate polygons, e.g. with overlapping edges. Cut off the most convex vertex to make progress.
+			a, b, c = [points[numpy.roll(ring, i)] for i in [1, 0, -1]]
+			chosen = numpy.zeros(len(ring), bool)
+			chosen[numpy.argmax(_cross(b - a, c - b))] = True
+		
+		# Ears at different occurrences of a repeated vertex may overlap each other, so only one ear with a repeated vertex is cut off in each step.
+		repeated = _get_repeated(ring)
+		touching = chosen & (repeated | numpy.roll(repeated, 1) | numpy.roll(repeated, -1))
+		chosen &= ~touching
+		chosen[numpy.flatnonzero(touching)[:1]] = True
+		
+		# At least a triangle must remain.
+		indices = numpy.flatnonzero(chosen)[:len(ring) - 3]
+		triangles.append(numpy.stack([ring[indices - 1], ring[indices], ring[(indices + 1) % len(ring)]], axis = 1))
+		ring = numpy.delete(ring, indices)
+	
+	triangles.append(ring[numpy.newaxis])
+	
+	return numpy.concatenate(triangles)
+
+
+def _is_in_wedge(points, ring, position, direction):
+	"""
+	Return whether the specified direction from the vertex at the specified position of the ring points into the interior of the polygon.
+	"""
+	
+	v = points[ring[position]]
+	a = points[ring[position - 1]] - v
+	b = points[ring[(position + 1) % len(ring)]] - v
+	
+	if _cross(b, a) > 0:
+		return _cross(b, direction) > 0 and _cross(direction, a) > 0
+	else:
+		return not (_cross(a, direction) >= 0 and _cross(direction, b) >= 0)
+
+
+def _bridge_holes(points, outer, holes):
+	"""
+	Join the holes of a polygon with its outer boundary by connecting each hole to a visible vertex of the boundary with a pair of edges. Returns a single ring of indices into points, in which the vertices at both ends of each such bridge appear twice.
+	"""
+	
+	ring = outer
+	
+	# Holes are processed from right to left, so that holes can be connected to the boundary through previously connected holes.
+	holes = sorted(holes, key = lambda x: -points[x, 0].max())
+	
+	for i, hole in enumerate(holes):
+		# A hole touching the boundary, which clipper does not join with it, is joined at the vertex they share, without a bridge.
+		shared = numpy.argwhere(ring[:, numpy.newaxis] == hole[numpy.newaxis])
+		
+		if len(shared):
+			position, start = shared[0]
+			hole = numpy.roll(hole, -start)
+			ring = numpy.concatenate([ring[:position + 1], hole[1:], ring[position:]])
+			
+			continue
+		
+		hole = numpy.roll(hole, -numpy.argmax(points[hole, 0]))
+		m = points[hole[0]]
+		
+		# All edges which a bridge must not cross.
+		edges = numpy.concatenate([numpy.stack([j, numpy.roll(j, -1)], axis = 1) for j in [ring] + holes[i:]])
+		p, q = points[edges[:, 0]], points[edges[:, 1]]
+		
+		for position in numpy.argsort(numpy.linalg.norm(points[ring] - m, axis = 1)):
+			v = points[ring[position]]
+			
+			# Edges touching the ends of the bridge do not cross it.
+			touching = numpy.all(p == v, axis = 1) | numpy.all(q == v, axis = 1) | numpy.all(p == m, axis = 1) | numpy.all(q == m, axis = 1)
+			crossing = (_cross(v - m, p - m) * _cross(v - m, q - m) < 0) & (_cross(q - p, m - p) * _cross(q - p, v - p) < 0)
+			
+			# Vertices lying on the bridge, which are not detected as crossing edges. The bridge has a length, as the hole does not share a vertex with the boundary.
+			t = numpy.dot(p - m, v - m) / numpy.dot(v - m, v - m)
+			collinear = numpy.abs(_cross(v - m, p - m)) <= collinear_eps * numpy.linalg.norm(v - m) * numpy.linalg.norm(p - m, axis = 1)
+			on_bridge = collinear & (t > 0) & (t < 1)
+			
+			if not numpy.any(crossing & ~touching | on_bridge) and _is_in_wedge(points, ring, position, m - v):
+				break
+		else:
+			raise util.UserError('Could not connect a hole to the boundary of a polygon.')
+		
+		ring = numpy.concatenate([ring[:position + 1], hole, hole[:1], ring[position:]])
+	
+	return ring
+
+
+@util.stage('compute')
+def triangulate(polygon : paths.Polygon):
+	"""
+	Return an array of shape (n, 3, 2) of triangles covering the specified polygon, each ordered counter-clockwise.
+	"""
+	
+	triangles = []
+	
+	for component in polygon.simple_components:
+		rings = [i.m[:2].T for i in component]
+		starts = numpy.cumsum([0] + [len(i) for i in rings])
+		
+		# Vertices where rings touch each other get the same index.
+		points, indices = numpy.unique(numpy.concatenate(rings), axis = 0, return_inverse = True)
+		outer, *holes = [indices.reshape(-1)[i:j] for i, j in zip(starts, starts[1:])]
+		
+		triangles.append(points[_triangulate_ring(points, _bridge_holes(points, outer, holes))])
+	
+	if not triangles:
+		return numpy.zeros((0, 3, 2))
+	
+	return numpy.concatenate(triangles)
+
+
+@util.stage('compute')
+def extrude(polygon : paths.Polygon, height):
+	"""
+	Return the mesh of the prism produced by extruding the specified polygon from the xy plane to the specified height along the z axis, like `linear_extrude()` in OpenSCAD.
+	"""
+	
+	def lift(vertices, z):
+		return numpy.concatenate([vertices, numpy.full(vertices.shape[:-1] + (1,), float(z))], axis = -1)
+	
+	caps = triangulate(polygon)
+	
+	# The bottom cap is viewed from below.
+	bottom = lift(caps[:, ::-1], 0)
+	top = lift(caps, height)
+	
+	# The interior of the polygon is to the left of each edge, both for the outer boundaries and the holes.
+	starts = numpy.concatenate([j.m[:2].T for i in polygon.simple_components for j in i] or [numpy.zeros((0, 2))])
+	ends = numpy.concatenate([numpy.roll(j.m[:2].T, -1, axis = 0) for i in polygon.simple_components for j in i] or [numpy.zeros((0, 2))])
+	a0, b0, a1, b1 = lift(starts, 0), lift(ends, 0), lift(starts, height), lift(ends, height)
+	walls = numpy.concatenate([numpy.stack([a0, b0, b1], axis = 1), numpy.stack([a0, b1, a1], axis = 1)])
+	
+	return numpy.concatenate([bottom, top, walls])
+
+
+def transform(mesh, transformation):
+	"""
+	Apply a transformation matrix of shape (4, 4), as returned by `polyhedra.face_coordinate_system()`, to the specified mesh.
+	"""
+	
+	return numpy.dot(mesh, transformation[:3, :3].T) + transformation[:3, 3]
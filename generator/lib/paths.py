@@ -1,5 +1,11 @@
-import math, abc, numpy, pyclipper, fractions
-from . import linalg, util
+# Annotations are not evaluated so that defining functions does not load numpy.
+from __future__ import annotations
+import math, abc, json, time, functools, collections
+from . import linalg, util, trace, planner, explain
+
+
+numpy = util.lazy_import('numpy')
+pyclipper = util.lazy_import('pyclipper')
 
 
 class _Transformable(metaclass = abc.ABCMeta):
@@ -140,17 +146,13 @@ class Path(_Transformable):
 		return numpy.count_nonzero(self.m[2]) == self.m.shape[0]
 
 
-_the_one = numpy.array([1], numpy.float64)
-_the_zero = numpy.array([0], numpy.float64)
-
-
 def _cast_vertex(v, direction = False):
 	arr = numpy.array(v, numpy.float64)
 	
 	assert arr.shape == (2,)
 	assert not direction or numpy.count_nonzero(arr)
 	
-	return numpy.concatenate((arr, _the_zero if direction else _the_one))
+	return numpy.append(arr, 0.0 if direction else 1.0)
 
 		
 def path(*vertices):
@@ -189,8 +191,14 @@ def join_paths(*paths):
 # See http://www.angusj.com/delphi/clipper/documentation/Docs/Overview/Rounding.htm. We use half the available range because otherwise clipper may return coordinates outside the valid range of coordinates.
 _clipper_range = (1 << 61)
 
-# Chosen by fair dice roll.
-_clipper_scale = 1 << 31
+# Largest coordinate clipper accepts as input. Results of operations on paths reaching to the border of _clipper_range may contain vertices slightly outside of it.
+_clipper_hi_range = (1 << 62) - 1
+
+# Finite coordinates are converted to the representation used for clipper so that their absolute values stay below this limit. This leaves a margin of 2^16 between the largest finite coordinates and the vertices used to represent infinity and keeps all finite coordinates exactly representable as floats. The resolution of the conversion is thus at least 2^-45 times the largest finite coordinate of an expression.
+_clipper_finite_range = 1 << 45
+
+# Scale used to convert coordinates of expressions without any finite coordinates. Chosen by fair dice roll.
+_default_clipper_scale = 1 << 31
 
 _quadrant_corners = [
 	(_clipper_range, _clipper_range),
@@ -199,6 +207,388 @@ _quadrant_corners = [
 	(_clipper_range, -_clipper_range)]
 
 
+# Names of the constants of pyclipper for the join types accepted by `Polygon.offset()`. pyclipper is only loaded when a polygon is evaluated.
+_join_types = {
+	'miter': 'JT_MITER',
+	'round': 'JT_ROUND',
+	'square': 'JT_SQUARE' }
+
+# Relative tolerance used to decide whether a transformation is a similarity transformation.
+_similarity_eps = 1e-12
+
+# Number of results of boolean operations kept during an evaluation for reuse by later evaluations of the same operation.
+_result_cache_size = 8
+
+# Default for the maximum distance by which curves created by operations like `Polygon.offset()` may deviate from the exact result. Given in the units of the coordinate system the polygon is finally rendered in.
+default_tolerance = 0.01
+
+
+class _Measurement:
+	"""
+	Statistics about the evaluations of a polygon which are shown by `Polygon.explain()`.
+	"""
+	
+	def __init__(self):
+		# Number of times the polygon has been evaluated, not counting results reused from a cache.
+		self.evaluation_count = 0
+		
+		# Number of vertices of the result of the last evaluation.
+		self.vertex_count = 0
+		
+		# Total time in seconds spent evaluating the polygon itself, excluding the time spent evaluating its children.
+		self.time = 0.0
+
+
+class _Evaluation:
+	"""
+	State shared by all nodes of a polygon expression while it is being evaluated.
+	"""
+	
+	def __init__(self, scale, nested = False):
+		# Factor by which coordinates are multiplied to convert them to the representation used for clipper. This factor is already included in the transformations passed to `Polygon._get_pyclipper_paths()`.
+		self.scale = scale
+		
+		# Whether boolean operations return their results as nested components, using a PolyTree, so that later operations only pass the components overlapping the other operand to clipper. Otherwise they return a single, non-nested component, which is cheaper for the small operands used in this project.
+		self.nested = nested
+		
+		# Maps the most recently evaluated boolean operations to the linear part and the translation part of the transformation they were evaluated with and their result. Discarded together with the evaluation.
+		self._results = collections.OrderedDict()
+	
+	def get_result(self, polygon : Polygon, tm : numpy.ndarray):
+		"""
+		Return the cached result of evaluating the specified polygon with the specified transformation or None, if no such result is available.
+		
+		A finite result is also reused when the translation only differs by whole units of the representation used for clipper.
+		"""
+		
+		entry = self._results.get(polygon)
+		
+		if entry is None:
+			return None
+		
+		linear, translation, components = entry
+		shift = tm[:2, 2] - translation
+		
+		if not numpy.array_equal(tm[:2, :2], linear):
+			return None
+		
+		self._results.move_to_end(polygon)
+		
+		if not shift.any():
+			return components
+		
+		if all(float(i).is_integer() for i in shift) and all(_is_finite(i.paths) for i in components):
+			return [i.transformed(numpy.eye(2), shift) for i in components]
+		
+		return None
+	
+	def set_result(self, polygon : Polygon, tm : numpy.ndarray, components : list):
+		"""
+		Remember the result of evaluating the specified polygon with the specified transformation, evicting the least recently used results beyond `_result_cache_size`.
+		"""
+		
+		self._results[polygon] = tm[:2, :2], tm[:2, 2], components
+		self._results.move_to_end(polygon)
+		
+		while len(self._results) > _result_cache_size:
+			self._results.popitem(last = False)
+
+
+def _get_clipper_scale(extent):
+	"""
+	Return the power of two by which coordinates are multiplied to convert them to the representation used for clipper, for an expression whose finite coordinates have absolute values up to the specified extent.
+	"""
+	
+	if not extent:
+		return float(_default_clipper_scale)
+	
+	return 2.0 ** math.floor(math.log2(_clipper_finite_range / extent))
+
+
+def _to_clipper(tm : numpy.ndarray, m : numpy.ndarray):
+	"""
+	Transform an array of shape (3, n) of homogeneous coordinates with a transformation matrix which includes the conversion to the representation used for clipper and return the result as an array of shape (n, 2) of ints.
+	"""
+	
+	res = numpy.rint(numpy.dot(tm, m)[:2].T)
+	
+	if not numpy.all(numpy.abs(res) < _clipper_range):
+		raise Exception('Coordinates are outside of range supported by Clipper: {}'.format(res))
+	
+	return res.astype(numpy.int64)
+
+
+def _remove_repeated_vertices(vertices : numpy.ndarray):
+	"""
+	Remove vertices from an array of shape (n, 2) which are equal to the vertex before them, including the first vertex, if it is equal to the last one.
+	"""
+	
+	return vertices[numpy.any(vertices != numpy.roll(vertices, 1, 0), 1)]
+
+
+def _get_pyclipper(subject_paths, clip_paths, strictly_simple = False):
+	pc = pyclipper.Pyclipper()
+	pc.StrictlySimple = strictly_simple
+	
+	for i in subject_paths:
+		pc.AddPath(i, pyclipper.PT_SUBJECT, True)
+	
+	for i in clip_paths:
+		pc.AddPath(i, pyclipper.PT_CLIP, True)
+	
+	return pc
+
+
+def _check_solution(solution):
+	# Clipper can return paths that it itself considers invalid as input. ._.
+	assert all(-_clipper_hi_range <= k <= _clipper_hi_range for i in solution for j in i for k in j), solution
+	assert all(len(i) > 2 for i in solution)
+
+
+def _execute(operation, subject_paths, clip_paths):
+	"""
+	Run a clipper operation on two lists of paths in the representation used for clipper, both interpreted using the even-odd rule.
+	"""
+	
+	# Clipper refuses to operate on nothing.
+	if not subject_paths and not clip_paths:
+		return []
+	
+	start_time = time.perf_counter()
+	solution = _get_pyclipper(subject_paths, clip_paths).Execute(operation, pyclipper.PFT_EVENODD, pyclipper.PFT_EVENODD)
+	trace.record(_get_operation_names()[operation], subject_paths, clip_paths, solution, start_time)
+	_check_solution(solution)
+	
+	return solution
+
+
+def _execute_tree(operation, subject_paths, clip_paths, strictly_simple = False):
+	"""
+	Like `_execute()` but return the result as a list of nested `_Component` instances, one for each outer boundary of the result.
+	
+	If `strictly_simple` is set, no path of the result touches itself.
+	"""
+	
+	if not subject_paths and not clip_paths:
+		return []
+	
+	start_time = time.perf_counter()
+	tree = _get_pyclipper(subject_paths, clip_paths, strictly_simple).Execute2(operation, pyclipper.PFT_EVENODD, pyclipper.PFT_EVENODD)
+	components = []
+	
+	def visit_outers(node):
+		for i in node.Childs:
+			paths = [i.Contour] + [j.Contour for j in i.Childs]
+			_check_solution(paths)
+			components.append(_Component(paths, True))
+			
+			# Islands within holes are separate components.
+			for j in i.Childs:
+				visit_outers(j)
+	
+	visit_outers(tree)
+	trace.record(_get_operation_names()[operation], subject_paths, clip_paths, _flatten_components(components), start_time)
+	
+	return components
+
+
+def _execute_components(operation, subject_paths, clip_paths, nested):
+	"""
+	Run a clipper operation like `_execute()` and return the result as a list of components, which are nested if `nested` is set.
+	"""
+	
+	if nested:
+		return _execute_tree(operation, subject_paths, clip_paths)
+	
+	return _get_components(_execute(operation, subject_paths, clip_paths))
+
+
+def _get_component_paths(components, evaluation : _Evaluation):
+	"""
+	Convert nested `_Component` instances produced by the specified evaluation to lists of `Path` instances in the coordinate system of the evaluated polygon.
+	"""
+	
+	def iter_paths(component):
+		if not _is_finite(component.paths):
+			raise Exception('Result contains vertices at infinity.')
+		
+		for i in component.paths:
+			vertices = numpy.array(i, numpy.float64) / evaluation.scale
+			
+			yield Path(numpy.vstack([vertices.T, numpy.ones(len(vertices))]))
+	
+	return [list(iter_paths(i)) for i in components]
+
+
+class _Component:
+	"""
+	Part of the result of evaluating a polygon which does not overlap any other part of the same result, given as a list of paths in the representation used for clipper.
+	
+	If the component is nested, the first path is an outer boundary, oriented counter-clockwise, and the remaining paths are the holes within it, oriented clockwise. Otherwise the paths can be anything and are interpreted using the even-odd rule.
+	"""
+	
+	def __init__(self, paths, nested):
+		self.paths = paths
+		self.nested = nested
+		
+		self._bounds = None
+	
+	@property
+	def bounds(self):
+		"""
+		The bounding box of the component as a tuple `(min_x, min_y, max_x, max_y)` of ints.
+		"""
+		
+		if self._bounds is None:
+			# The holes of a nested component lie within its outer boundary.
+			paths = self.paths[:1] if self.nested else self.paths
+			xs = [x for i in paths for x, _ in i]
+			ys = [y for i in paths for _, y in i]
+			
+			self._bounds = min(xs), min(ys), max(xs), max(ys)
+		
+		return self._bounds
+	
+	def transformed(self, m : numpy.ndarray, translation : numpy.ndarray):
+		"""
+		Return this component with `_transform_pyclipper_paths()` applied to its paths. The orientation of the paths is retained for mirroring transformations.
+		"""
+		
+		paths = _transform_pyclipper_paths(self.paths, m, translation)
+		
+		if numpy.linalg.det(m) < 0:
+			paths = [i[::-1] for i in paths]
+		
+		return type(self)(paths, self.nested)
+
+
+def _get_components(paths):
+	"""
+	Wrap a list of paths in the representation used for clipper in a list containing a single, non-nested component, or no component at all if the list is empty.
+	"""
+	
+	return [_Component(paths, False)] if paths else []
+
+
+def _flatten_components(components):
+	"""
+	Return the paths of a list of components as a single list of paths.
+	"""
+	
+	return [j for i in components for j in i.paths]
+
+
+@functools.lru_cache(None)
+def _get_operation_names():
+	"""
+	Return a dict with the names of the boolean operations of clipper.
+	"""
+	
+	return {
+		pyclipper.CT_INTERSECTION: 'intersection',
+		pyclipper.CT_UNION: 'union',
+		pyclipper.CT_DIFFERENCE: 'difference',
+		pyclipper.CT_XOR: 'xor' }
+
+
+@functools.lru_cache(None)
+def _get_disjoint_components_kept():
+	"""
+	Return a dict with, for each boolean operation, whether the components of the left and right operand which do not overlap the bounding box of the other operand are part of the result. Such components are passed through unchanged if this is true and dropped otherwise.
+	"""
+	
+	return {
+		pyclipper.CT_INTERSECTION: (False, False),
+		pyclipper.CT_UNION: (True, True),
+		pyclipper.CT_DIFFERENCE: (True, False),
+		pyclipper.CT_XOR: (True, True) }
+
+
+def _split_overlapping(components, others):
+	"""
+	Split a list of components into the ones overlapping the bounding box of another list of components and the ones not overlapping it.
+	"""
+	
+	if not others:
+		return [], components
+	
+	min_xs, min_ys, max_xs, max_ys = zip(*[i.bounds for i in others])
+	min_x, min_y, max_x, max_y = min(min_xs), min(min_ys), max(max_xs), max(max_ys)
+	overlapping = []
+	disjoint = []
+	
+	for i in components:
+		component_min_x, component_min_y, component_max_x, component_max_y = i.bounds
+		
+		if component_min_x <= max_x and min_x <= component_max_x and component_min_y <= max_y and min_y <= component_max_y:
+			overlapping.append(i)
+		else:
+			disjoint.append(i)
+	
+	return overlapping, disjoint
+
+
+def _combine_components(operation, left, right, nested):
+	"""
+	Combine two lists of components with a boolean operation and return the result as a list of components, which are nested if `nested` is set.
+	
+	Only the components overlapping the bounding box of the other operand are passed to clipper.
+	"""
+	
+	keep_left, keep_right = _get_disjoint_components_kept()[operation]
+	left_overlapping, left_disjoint = _split_overlapping(left, right)
+	right_overlapping, right_disjoint = _split_overlapping(right, left)
+	components = _execute_components(operation, _flatten_components(left_overlapping), _flatten_components(right_overlapping), nested)
+	
+	if keep_left:
+		components = left_disjoint + components
+	
+	if keep_right:
+		components = components + right_disjoint
+	
+	return components
+
+
+def _is_finite(paths):
+	"""
+	Return whether none of the vertices of a list of paths in the representation used for clipper lie on the border of the range supported by clipper.
+	"""
+	
+	return all(abs(k) < _clipper_range for i in paths for j in i for k in j)
+
+
+def _transform_pyclipper_paths(paths, m : numpy.ndarray, translation : numpy.ndarray):
+	"""
+	Apply a linear transformation and then a translation to a list of paths in the representation used for clipper. The translation is given in that representation.
+	"""
+	
+	def iter_paths():
+		for i in paths:
+			transformed = numpy.rint(numpy.dot(numpy.array(i, numpy.float64), m.T) + translation)
+			
+			if not numpy.all(numpy.abs(transformed) < _clipper_range):
+				raise Exception('Transformed coordinates are outside of range supported by Clipper.')
+			
+			yield transformed.astype(numpy.int64).tolist()
+	
+	return list(iter_paths())
+
+
+def _get_similarity_scale(tm : numpy.ndarray):
+	"""
+	Return the scale factor of a transformation matrix if it represents a similarity transformation (a combination of a uniform scaling, a rotation, a reflection and a translation). Otherwise, return None.
+	"""
+	
+	m = tm[:2, :2]
+	g = numpy.dot(m.T, m)
+	s = (g[0, 0] + g[1, 1]) / 2
+	
+	if not s or abs(g[0, 1]) > _similarity_eps * s or abs(g[0, 0] - g[1, 1]) > _similarity_eps * s:
+		return None
+	
+	return math.sqrt(s)
+
+
 class Polygon(_Transformable):
 	"""
 	Represents a polygon or set of polygons which can be transformed and operated on with some boolean and morphological operations and exported to Asymptote and OpenSCAD.
@@ -232,56 +622,338 @@ class Polygon(_Transformable):
 	def _combine(self, other : 'Polygon', operation):
 		return _CombinedPolygon(self, other, operation)
 	
+	def offset(self, delta, join = 'miter', *, miter_limit = 2, tolerance = default_tolerance):
+		"""
+		Return this polygon grown by the specified distance. A negative distance shrinks the polygon.
+		
+		`join` selects how the offset edges are joined at convex corners and is one of `'miter'`, `'round'` or `'square'`. `miter_limit` limits how far mitered corners may extend, as a multiple of `delta`, before they are squared off. `tolerance` limits the deviation of the arcs created by round joins from the true arc.
+		
+		The distance is given in the coordinate system of this polygon and is scaled along with the polygon when it is transformed.
+		"""
+		
+		return _OffsetPolygon(self, delta, getattr(pyclipper, _join_types[join]), miter_limit, tolerance)
+	
+	def tool_offset(self, radius, *, tolerance = default_tolerance):
+		"""
+		Return the Minkowski sum of this polygon with a disk of the specified radius, which is the area covered by a round tool of that radius whose center is moved within this polygon. With a negative radius, the area within which the center of the tool can be moved without leaving this polygon is returned instead.
+		
+		This is useful e.g. to compensate for the kerf of a laser cutter, using half the width of the kerf as the radius.
+		"""
+		
+		return self.offset(radius, 'round', tolerance = tolerance)
+	
+	def simplify(self, tolerance = default_tolerance):
+		"""
+		Return this polygon with vertices removed which are (nearly) duplicates of their neighbors or (nearly) collinear with the vertices around them.
+		
+		Every removed vertex lies within the specified tolerance of the boundary of the simplified polygon. The tolerance is given in the units of the coordinate system the polygon is finally rendered in.
+		"""
+		
+		return _SimplifiedPolygon(self, tolerance)
+	
 	def _transform(self, tm : numpy.ndarray):
 		return _TransformedPolygon(self, tm)
 	
-	@abc.abstractmethod
-	def _get_pyclipper_paths(self, tm : numpy.ndarray) -> list:
+	@property
+	def _bounded(self):
 		"""
-		Return a list of tuples of ints representing the path in the representation used for clipper.
+		Whether this polygon is known to be bounded.
 		"""
+		
+		return False
+	
+	# Cache for _approximated.
+	_cached_approximated = None
 	
 	@property
-	@abc.abstractmethod
-	def paths(self):
+	def _approximated(self):
 		"""
-		List of paths describing the boundaries of all disconnected parts of this polygon.
+		Whether this polygon may have vertices approximating curves, like the ones of sectors whose number of segments is chosen using a tolerance and of offsets with round joins.
 		
-		Accessing this property on a composite polygon will lead to all intermediate operations and transformations being executed. The resulting polygon must be finite, otherwise an exception will be thrown.
+		Other polygons only have vertices taken from their input and the intersections of their edges.
 		"""
+		
+		if self._cached_approximated is None:
+			self._cached_approximated = self._has_approximations()
+		
+		return self._cached_approximated
 	
-	@classmethod
-	def _transform_coordinate(cls, tm : numpy.ndarray, v : numpy.ndarray):
+	def _has_approximations(self):
+		return any(i._approximated for i in self._get_children())
+	
+	# Cache for _vertex_estimate.
+	_cached_vertex_estimate = None
+	
+	@property
+	def _vertex_estimate(self):
 		"""
-		Transform a coordinate with a transformation matrix and return the result as a pair of fractions.
+		Rough estimate of the number of vertices of the result of evaluating this polygon, used by `planner.Planner` to order operands.
 		"""
 		
-		x, y, _ = numpy.dot(tm, v)
+		if self._cached_vertex_estimate is None:
+			self._cached_vertex_estimate = self._estimate_vertices()
 		
-		return fractions.Fraction.from_float(x), fractions.Fraction.from_float(y)
+		return self._cached_vertex_estimate
 	
-	@classmethod
-	def _scale_point(cls, tm : numpy.ndarray, p : numpy.ndarray):
+	def _estimate_vertices(self):
+		return sum(i._vertex_estimate for i in self._get_children())
+	
+	def _get_children(self):
 		"""
-		Transform a coordinate with a transformation matrix and convert the values to the rance used for clipper.
+		Return the polygons this polygon is computed from.
 		"""
 		
-		x, y = cls._transform_coordinate(tm, p)
+		return ()
+	
+	def _with_children(self, children):
+		"""
+		Return a copy of this polygon computed from the specified polygons instead of the ones returned by `_get_children()`.
+		"""
 		
-		return cls._scale(x), cls._scale(y)
+		return self
 	
-	@classmethod
-	def _scale(cls, x):
+	# Set by _measure().
+	_measurement = None
+	
+	def _measure(self, paths, start_time):
 		"""
-		Convert a coordinate value to the numeric range used for clipper and return the result as an int.
+		Record an evaluation of this polygon which produced the specified list of paths and started at the specified value of `time.perf_counter()`.
 		"""
 		
-		res = round(_clipper_scale * x)
+		if self._measurement is None:
+			self._measurement = _Measurement()
 		
-		if not (-_clipper_range < res < _clipper_range):
-			raise Exception('Coordinate {} is outside of range supported by Clipper.'.format(x))
+		self._measurement.evaluation_count += 1
+		self._measurement.vertex_count = sum(len(i) for i in paths)
+		self._measurement.time += time.perf_counter() - start_time
+	
+	def _get_label(self):
+		"""
+		Return a short description of this polygon used by `explain()`.
+		"""
 		
-		return res
+		return type(self).__name__.strip('_')
+	
+	def explain(self, format = 'text'):
+		"""
+		Return a description of the expression which is evaluated for this polygon. Use `optimized().explain()` to describe the rewritten expression instead.
+		
+		For each node of the expression, its type, whether it is known to be bounded, the estimated number of vertices and, if the polygon has already been evaluated, the measured number of vertices, the number of evaluations and the time spent in the node itself are listed. Nodes which are used more than once are marked as shared.
+		
+		:param format: `'text'` for an indented tree, `'dot'` for a Graphviz graph or `'json'` for a JSON document.
+		"""
+		
+		nodes = explain.get_nodes(self)
+		
+		if format == 'text':
+			return explain.format_text(nodes)
+		elif format == 'dot':
+			return explain.format_dot(nodes)
+		elif format == 'json':
+			return json.dumps({ 'nodes': nodes }, indent = 2)
+		else:
+			raise ValueError('Unknown format: {}'.format(format))
+	
+	# Cache for optimized().
+	_cached_plan = None
+	
+	def optimized(self):
+		"""
+		Return a polygon which is equal to this polygon but may be cheaper to evaluate, see `planner.Planner`.
+		
+		Polygons are evaluated as they are written. The rewritten polygon may round intersection points differently and thus produce slightly different vertices, so it is only used when it is evaluated explicitly, e.g. using `optimized().paths`.
+		"""
+		
+		if self._cached_plan is None:
+			planner.Planner(self).plan(self)
+		
+		return self._cached_plan
+	
+	# Cache for _get_edges().
+	_edges = None
+	
+	# Cache for components.
+	_cached_components = None
+	
+	@property
+	def components(self):
+		"""
+		List of the disconnected parts of this polygon. Each part is a list of paths, the first of which is the outer boundary of the part, oriented counter-clockwise, followed by the boundaries of the holes within it, oriented clockwise.
+		
+		To get this structure, the boolean operations are evaluated keeping the hierarchy of their results, so that parts which were passed through the operations unchanged are not processed again. The other properties evaluate them to flat lists of paths. Like `paths`, the polygon must be finite.
+		"""
+		
+		if self._cached_components is None:
+			evaluation, components = self._evaluate(nested = True)
+			
+			def iter_components():
+				for i in components:
+					if i.nested:
+						yield i
+					else:
+						yield from _execute_tree(pyclipper.CT_UNION, i.paths, [])
+			
+			self._cached_components = _get_component_paths(iter_components(), evaluation)
+		
+		return self._cached_components
+	
+	# Cache for simple_components.
+	_cached_simple_components = None
+	
+	@property
+	def simple_components(self):
+		"""
+		Like `components`, but computed so that no path touches itself, which the paths returned by clipper otherwise may. Paths of different parts and the holes within a part may still touch each other at single vertices. Used to triangulate polygons.
+		"""
+		
+		if self._cached_simple_components is None:
+			evaluation, components = self._evaluate()
+			paths = _flatten_components(components)
+			simple_components = _execute_tree(pyclipper.CT_UNION, paths, [], strictly_simple = True)
+			
+			# Clipper occasionally drops parts of the polygon when making the paths strictly simple, in which case the paths of `components` are used instead.
+			if numpy.isclose(sum(map(pyclipper.Area, _flatten_components(simple_components))), sum(map(pyclipper.Area, paths))):
+				self._cached_simple_components = _get_component_paths(simple_components, evaluation)
+			else:
+				self._cached_simple_components = self.components
+		
+		return self._cached_simple_components
+	
+	def _get_edges(self):
+		"""
+		Return the edges of the boundary of this polygon as a pair of arrays of shape (n, 2) containing the start and end points of the edges.
+		
+		The edges are taken from the paths returned by clipper, which are oriented counter-clockwise for outer boundaries and clockwise for holes.
+		"""
+		
+		if self._edges is None:
+			evaluation, components = self._evaluate()
+			solution = _execute(pyclipper.CT_UNION, _flatten_components(components), [])
+			
+			if not _is_finite(solution):
+				raise Exception('Result contains vertices at infinity.')
+			
+			starts = [numpy.array(i, numpy.float64) / evaluation.scale for i in solution]
+			ends = [numpy.roll(i, -1, 0) for i in starts]
+			
+			if solution:
+				self._edges = numpy.concatenate(starts), numpy.concatenate(ends)
+			else:
+				self._edges = numpy.zeros((0, 2)), numpy.zeros((0, 2))
+		
+		return self._edges
+	
+	@property
+	def area(self):
+		"""
+		The area of this polygon.
+		"""
+		
+		starts, ends = self._get_edges()
+		
+		return numpy.sum(starts[:, 0] * ends[:, 1] - starts[:, 1] * ends[:, 0]) / 2
+	
+	@property
+	def perimeter(self):
+		"""
+		The total length of the boundaries of this polygon, including the boundaries of holes.
+		"""
+		
+		starts, ends = self._get_edges()
+		
+		return numpy.sum(numpy.linalg.norm(ends - starts, axis = 1))
+	
+	@property
+	def bounds(self):
+		"""
+		The bounding box of this polygon as an array `[[min_x, min_y], [max_x, max_y]]` or None, if the polygon is empty.
+		"""
+		
+		starts, _ = self._get_edges()
+		
+		if not len(starts):
+			return None
+		
+		return numpy.array([numpy.amin(starts, 0), numpy.amax(starts, 0)])
+	
+	@property
+	def centroid(self):
+		"""
+		The centroid of the area of this polygon or None, if the polygon has no area.
+		"""
+		
+		starts, ends = self._get_edges()
+		cross = starts[:, 0] * ends[:, 1] - starts[:, 1] * ends[:, 0]
+		area = numpy.sum(cross) / 2
+		
+		if not area:
+			return None
+		
+		return numpy.sum((starts + ends) * cross[:, None], 0) / (6 * area)
+	
+	def contains(self, points):
+		"""
+		Return whether the specified points lie within this polygon.
+		
+		`points` can be a single point or an array of shape (n, 2), in which case an array of n bools is returned. The result for points lying exactly on the boundary is unspecified.
+		"""
+		
+		points = numpy.asarray(points, numpy.float64)
+		starts, ends = self._get_edges()
+		
+		# Arrays with one row per point and one column per edge.
+		px, py = [i[..., None] for i in numpy.moveaxis(points, -1, 0)]
+		(sx, sy), (ex, ey) = starts.T, ends.T
+		
+		crossing = (sy > py) != (ey > py)
+		
+		with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+			left = px < sx + (py - sy) * (ex - sx) / (ey - sy)
+		
+		return numpy.count_nonzero(crossing & left, -1) % 2 == 1
+	
+	def _evaluate(self, nested = False):
+		"""
+		Evaluate this polygon in its own coordinate system, using a conversion to the representation used for clipper chosen from the extent of the expression. If `nested` is set, the results of boolean operations are nested components.
+		
+		Returns the `_Evaluation` instance used and the resulting list of components.
+		"""
+		
+		evaluation = _Evaluation(_get_clipper_scale(self._get_extent(numpy.eye(3))), nested)
+		tm = numpy.diag([evaluation.scale, evaluation.scale, 1])
+		
+		return evaluation, self._get_pyclipper_components(tm, evaluation)
+	
+	@abc.abstractmethod
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation) -> list:
+		"""
+		Return a list of tuples of ints representing the path in the representation used for clipper.
+		
+		The specified transformation includes the conversion to the representation used for clipper.
+		"""
+	
+	def _get_pyclipper_components(self, tm : numpy.ndarray, evaluation : _Evaluation) -> list:
+		"""
+		Return the same result as `_get_pyclipper_paths()` as a list of `_Component` instances.
+		"""
+		
+		return _get_components(self._get_pyclipper_paths(tm, evaluation))
+	
+	@abc.abstractmethod
+	def _get_extent(self, tm : numpy.ndarray) -> float:
+		"""
+		Return an upper bound for the absolute values of the finite coordinates used while evaluating this polygon with the specified transformation, which does not include the conversion to the representation used for clipper.
+		"""
+	
+	@property
+	@abc.abstractmethod
+	def paths(self):
+		"""
+		List of paths describing the boundaries of all disconnected parts of this polygon.
+		
+		Accessing this property on a composite polygon will lead to all intermediate operations and transformations being executed. The resulting polygon must be finite, otherwise an exception will be thrown.
+		"""
+	
 
 
 class _ConcretePolygon(Polygon):
@@ -296,26 +968,29 @@ class _ConcretePolygon(Polygon):
 		
 		self._paths = paths
 	
-	def _get_pyclipper_paths(self, tm: numpy.ndarray):
+	@property
+	def _bounded(self):
+		return True
+	
+	def _estimate_vertices(self):
+		return sum(i.m.shape[1] for i in self._paths)
+	
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
 		def _iter_paths():
 			for i in self._paths:
-				def _iter_vertices():
-					path = [self._scale_point(tm, j) for j in i.m.T]
-					prev = path[-1]
-					
-					for j in path:
-						if j != prev:
-							prev = j
-							
-							yield j
-				
-				vertices = list(_iter_vertices())
+				vertices = _remove_repeated_vertices(_to_clipper(tm, i.m))
 				
 				if len(vertices) > 2:
-					yield vertices
+					yield vertices.tolist()
 		
 		return list(_iter_paths())
 	
+	def _get_extent(self, tm : numpy.ndarray):
+		return max((numpy.amax(numpy.abs(numpy.dot(tm, i.m)[:2])) for i in self._paths), default = 0)
+	
+	def _get_label(self):
+		return 'polygon with {} paths'.format(len(self._paths))
+	
 	@property
 	def paths(self):
 		return self._paths
@@ -333,33 +1008,20 @@ class _CompositePolygon(Polygon):
 		return self._cached_paths
 	
 	def _render(self):
-		paths = self._get_pyclipper_paths(numpy.eye(3))
+		evaluation, components = self._evaluate()
+		paths = _flatten_components(components)
+		
+		if not _is_finite(paths):
+			raise Exception('Result contains vertices at infinity.')
 		
 		def _iter_paths():
 			for i in paths:
-				def _iter_vertices():
-					path = [(self._unscale(x), self._unscale(y)) for x, y in i]
-					prev = path[-1]
-					
-					for j in path:
-						if j != prev:
-							prev = j
-							
-							yield j
-				
-				vertices = list(_iter_vertices())
+				vertices = _remove_repeated_vertices(numpy.array(i, numpy.float64) / evaluation.scale)
 				
 				if len(vertices) > 2:
-					yield path(*vertices)
+					yield Path(numpy.vstack([vertices.T, numpy.ones(len(vertices))]))
 		
 		return list(_iter_paths())
-	
-	@classmethod
-	def _unscale(cls, x):
-		if not (-_clipper_range < x < _clipper_range):
-			raise Exception('Result contains vertices at infinity.')
-		
-		return x / _clipper_scale
 
 
 class _TransformedPolygon(_CompositePolygon):
@@ -371,8 +1033,66 @@ class _TransformedPolygon(_CompositePolygon):
 		self._polygon = polygon
 		self._tm = tm
 	
-	def _get_pyclipper_paths(self, tm : numpy.ndarray):
-		return self._polygon._get_pyclipper_paths(numpy.dot(tm, self._tm))
+	@property
+	def _bounded(self):
+		return self._polygon._bounded
+	
+	def _get_children(self):
+		return self._polygon,
+	
+	def _with_children(self, children):
+		polygon, = children
+		
+		return _TransformedPolygon(polygon, self._tm)
+	
+	def _get_canonical_tm(self, tm : numpy.ndarray):
+		"""
+		For a similarity transformation applied to a boolean operation, the operation is evaluated without the rotation and translation part of the transformation, which are then applied to the result. This allows the evaluation to be shared by all copies of the subtree which only differ in their position and orientation.
+		
+		Returns the transformation containing only the uniform scaling or None, if the transformation cannot be split like this. Unbounded subtrees are not split, as their results contain vertices at infinity, which cannot be transformed.
+		"""
+		
+		if isinstance(self._polygon, _CombinedPolygon) and self._polygon._bounded:
+			scale = _get_similarity_scale(tm)
+			
+			if scale is not None:
+				canonical_tm = numpy.diag([scale, scale, 1])
+				
+				if not numpy.array_equal(tm, canonical_tm):
+					return canonical_tm
+		
+		return None
+	
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		return _flatten_components(self._get_pyclipper_components(tm, evaluation))
+	
+	def _get_pyclipper_components(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		tm = numpy.dot(tm, self._tm)
+		canonical_tm = self._get_canonical_tm(tm)
+		
+		if canonical_tm is not None:
+			components = self._polygon._get_pyclipper_components(canonical_tm, evaluation)
+			
+			# Vertices at infinity cannot be transformed.
+			if all(_is_finite(i.paths) for i in components):
+				rest_tm = numpy.dot(tm, numpy.linalg.inv(canonical_tm))
+				
+				return [i.transformed(rest_tm[:2, :2], rest_tm[:2, 2]) for i in components]
+		
+		return self._polygon._get_pyclipper_components(tm, evaluation)
+	
+	def _get_extent(self, tm : numpy.ndarray):
+		tm = numpy.dot(tm, self._tm)
+		canonical_tm = self._get_canonical_tm(tm)
+		extent = self._polygon._get_extent(tm)
+		
+		if canonical_tm is not None:
+			extent = max(extent, self._polygon._get_extent(canonical_tm))
+		
+		return extent
+	
+	def _get_label(self):
+		return 'transform {}'.format(self._tm[:2].tolist())
 
 
 class _CombinedPolygon(_CompositePolygon):
@@ -382,24 +1102,208 @@ class _CombinedPolygon(_CompositePolygon):
 		self._left = left
 		self._right = right
 		self._operation = operation
+		
+		self._cached_bounded = None
+	
+	@property
+	def _bounded(self):
+		if self._cached_bounded is None:
+			if self._operation == pyclipper.CT_INTERSECTION:
+				self._cached_bounded = self._left._bounded or self._right._bounded
+			elif self._operation == pyclipper.CT_DIFFERENCE:
+				self._cached_bounded = self._left._bounded
+			else:
+				self._cached_bounded = self._left._bounded and self._right._bounded
+		
+		return self._cached_bounded
+	
+	def _get_children(self):
+		return self._left, self._right
+	
+	def _with_children(self, children):
+		left, right = children
+		
+		return _CombinedPolygon(left, right, self._operation)
 	
-	def _get_pyclipper_paths(self, tm: numpy.ndarray):
-		pc = pyclipper.Pyclipper()
-		# pc.StrictlySimple = True
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		return _flatten_components(self._get_pyclipper_components(tm, evaluation))
+	
+	def _get_pyclipper_components(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		components = evaluation.get_result(self, tm)
 		
-		for i in self._left._get_pyclipper_paths(tm):
-			pc.AddPath(i, pyclipper.PT_SUBJECT, True)
+		if components is not None:
+			return components
 		
-		for i in self._right._get_pyclipper_paths(tm):
-			pc.AddPath(i, pyclipper.PT_CLIP, True)
+		left = self._left._get_pyclipper_components(tm, evaluation)
+		right = self._right._get_pyclipper_components(tm, evaluation)
+		start_time = time.perf_counter()
+		components = _combine_components(self._operation, left, right, evaluation.nested)
+		self._measure(_flatten_components(components), start_time)
+		evaluation.set_result(self, tm, components)
 		
-		solution = pc.Execute(self._operation, pyclipper.PFT_EVENODD, pyclipper.PFT_EVENODD)
+		return components
+	
+	def _get_extent(self, tm : numpy.ndarray):
+		return max(self._left._get_extent(tm), self._right._get_extent(tm))
+	
+	def _get_label(self):
+		return _get_operation_names()[self._operation]
+
+
+class _OffsetPolygon(_CompositePolygon):
+	def __init__(self, polygon : Polygon, delta, join_type, miter_limit, tolerance):
+		super().__init__()
 		
-		# Clipper can return paths that it itself considers invalid as input. ._.
-		assert all(-_clipper_range <= k <= _clipper_range for i in solution for j in i for k in j), solution
-		assert all(len(i) > 2 for i in solution)
+		self._polygon = polygon
+		self._delta = delta
+		self._join_type = join_type
+		self._miter_limit = miter_limit
+		self._tolerance = tolerance
+	
+	@property
+	def _bounded(self):
+		return self._polygon._bounded
+	
+	def _has_approximations(self):
+		return self._join_type == pyclipper.JT_ROUND or self._polygon._approximated
+	
+	def _estimate_vertices(self):
+		# Round joins add vertices at every convex corner.
+		return 2 * self._polygon._vertex_estimate
+	
+	def _get_children(self):
+		return self._polygon,
+	
+	def _with_children(self, children):
+		polygon, = children
+		
+		return _OffsetPolygon(polygon, self._delta, self._join_type, self._miter_limit, self._tolerance)
+	
+	@classmethod
+	def _get_scaled_delta(cls, tm : numpy.ndarray, delta):
+		# Offsets are scaled with the transformation. For a non-uniform scaling, the geometric mean of the scale factors is used.
+		return delta * math.sqrt(abs(numpy.linalg.det(tm[:2, :2])))
+	
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		delta = self._get_scaled_delta(tm, self._delta)
+		paths = self._polygon._get_pyclipper_paths(tm, evaluation)
+		start_time = time.perf_counter()
+		solution = self._offset(paths, delta, evaluation)
+		self._measure(solution, start_time)
 		
 		return solution
+	
+	def _offset(self, paths, delta, evaluation : _Evaluation):
+		if not delta:
+			return _execute(pyclipper.CT_UNION, paths, [])
+		
+		# Shrinking a polygon is implemented by growing its complement, so that unbounded polygons (whose boundaries include the edges of the range supported by clipper) can be handled the same way as bounded ones.
+		if delta < 0:
+			paths = _execute(pyclipper.CT_DIFFERENCE, [_quadrant_corners], paths)
+		else:
+			# Makes sure the paths are oriented the way PyclipperOffset expects them to be.
+			paths = _execute(pyclipper.CT_UNION, paths, [])
+		
+		start_time = time.perf_counter()
+		pco = pyclipper.PyclipperOffset(self._miter_limit, evaluation.scale * self._tolerance)
+		pco.AddPaths(paths, self._join_type, pyclipper.ET_CLOSEDPOLYGON)
+		offset_paths = pco.Execute(abs(delta))
+		trace.record('offset', paths, [], offset_paths, start_time)
+		
+		# Parts grown beyond the range supported by clipper are cut off again.
+		solution = _execute(pyclipper.CT_INTERSECTION, offset_paths, [_quadrant_corners])
+		
+		if delta < 0:
+			solution = _execute(pyclipper.CT_DIFFERENCE, [_quadrant_corners], solution)
+		
+		return solution
+	
+	def _get_extent(self, tm : numpy.ndarray):
+		return self._polygon._get_extent(tm) + abs(self._get_scaled_delta(tm, self._delta))
+	
+	def _get_label(self):
+		return 'offset {}'.format(self._delta)
+
+
+class _SimplifiedPolygon(_CompositePolygon):
+	# Distance in the representation used for clipper below which adjacent vertices are considered duplicates. This is only meant to remove noise introduced by rounding.
+	_clean_distance = 2
+	
+	def __init__(self, polygon : Polygon, tolerance):
+		super().__init__()
+		
+		self._polygon = polygon
+		self._tolerance = tolerance
+	
+	@property
+	def _bounded(self):
+		return self._polygon._bounded
+	
+	def _get_children(self):
+		return self._polygon,
+	
+	def _with_children(self, children):
+		polygon, = children
+		
+		return _SimplifiedPolygon(polygon, self._tolerance)
+	
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		return _flatten_components(self._get_pyclipper_components(tm, evaluation))
+	
+	def _get_pyclipper_components(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		tolerance = evaluation.scale * self._tolerance
+		paths = self._polygon._get_pyclipper_paths(tm, evaluation)
+		start_time = time.perf_counter()
+		paths = pyclipper.CleanPolygons(paths, self._clean_distance)
+		simplified = [[i[j] for j in self._simplify_ring(numpy.array(i, numpy.float64), tolerance)] for i in paths if len(i) > 2]
+		
+		# Removing vertices may make a path self-intersecting, which is resolved here.
+		components = _execute_components(pyclipper.CT_UNION, [i for i in simplified if len(i) > 2], [], evaluation.nested)
+		self._measure(_flatten_components(components), start_time)
+		
+		return components
+	
+	def _get_extent(self, tm : numpy.ndarray):
+		return self._polygon._get_extent(tm)
+	
+	def _get_label(self):
+		return 'simplify {}'.format(self._tolerance)
+	
+	@classmethod
+	def _simplify_ring(cls, points : numpy.ndarray, tolerance):
+		"""
+		Return the sorted indices of the vertices of a closed path to keep so that no removed vertex is farther than the specified tolerance from the edge replacing it, using the Ramer-Douglas-Peucker algorithm.
+		"""
+		
+		# Split the ring at the vertex farthest from the first one.
+		last = int(numpy.argmax(numpy.sum((points - points[0]) ** 2, 1)))
+		closed = numpy.concatenate([points, points[:1]])
+		stack = [(0, last), (last, len(points))]
+		keep = [0, last]
+		
+		while stack:
+			start, end = stack.pop()
+			
+			if end - start < 2:
+				continue
+			
+			a = closed[start]
+			d = closed[end] - a
+			v = closed[start + 1:end] - a
+			length = math.hypot(*d)
+			
+			if length:
+				distances = numpy.abs(d[0] * v[:, 1] - d[1] * v[:, 0]) / length
+			else:
+				distances = numpy.hypot(v[:, 0], v[:, 1])
+			
+			i = int(numpy.argmax(distances))
+			
+			if distances[i] > tolerance:
+				keep.append(start + 1 + i)
+				stack.extend([(start, start + 1 + i), (start + 1 + i, end)])
+		
+		return sorted(set(keep))
 
 
 class _HalfPlane(_CompositePolygon):
@@ -413,17 +1317,20 @@ class _HalfPlane(_CompositePolygon):
 		self._anchor = anchor
 		self._direction = direction
 	
-	def _get_pyclipper_paths(self, tm : numpy.ndarray):
+	def _estimate_vertices(self):
+		return 4
+	
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
 		# Used to correct inversion of the direction for mirroring transformations. 
 		det = numpy.linalg.det(tm[:2, :2])
 		
 		assert det
 		
 		# Anchor in the representation used for clipper.
-		px, py = self._scale_point(tm, self._anchor)
+		(px, py), = _to_clipper(tm, self._anchor[:, None]).tolist()
 		
-		# Transformed direction as fractions.
-		dx, dy = self._transform_coordinate(tm, self._direction / numpy.array([det, det, 1]))
+		# Transformed direction.
+		dx, dy, _ = numpy.dot(tm, self._direction / numpy.array([det, det, 1])).tolist()
 		
 		# Endpoints of the line segment inside the range supported by clipper.
 		e1x, e1y = self._project_infinity(px, py, dx, dy)
@@ -454,6 +1361,9 @@ class _HalfPlane(_CompositePolygon):
 		
 		return [list(iter_points())]
 	
+	def _get_extent(self, tm : numpy.ndarray):
+		return numpy.amax(numpy.abs(numpy.dot(tm, self._anchor)[:2]))
+	
 	@classmethod
 	def _project_infinity(cls, px, py, dx, dy):
 		"""
@@ -476,9 +1386,12 @@ class _HalfPlane(_CompositePolygon):
 	@classmethod
 	def _project_to_edge(cls, p1, p2, d1, d2):
 		if d1:
-			return min(round(p2 + (_clipper_range - p1) * d2 / d1), _clipper_range)
-		else:
-			return _clipper_range
+			e = p2 + (_clipper_range - p1) * d2 / d1
+			
+			if e < _clipper_range:
+				return round(e)
+		
+		return _clipper_range
 	
 	@classmethod
 	def _get_clipper_range_edges(cls, x, y):
@@ -498,8 +1411,14 @@ class _Plane(_CompositePolygon):
 	Special Polygon which represents the whole plane.
 	"""
 	
-	def _get_pyclipper_paths(self, tm : numpy.ndarray):
+	def _estimate_vertices(self):
+		return 4
+	
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
 		return [_quadrant_corners]
+	
+	def _get_extent(self, tm : numpy.ndarray):
+		return 0
 
 
 def polygon(*paths):
@@ -514,18 +1433,101 @@ def polygon(*paths):
 	return _ConcretePolygon([_cast_path(i) for i in paths])
 
 
-def circle(n = 64):
+def _sector_vertices(angle, n):
 	"""
-	Return a polygon approximating a circle using a regular polygon with the specified number of sides.
+	Return the vertices of a polygon approximating the sector of the unit circle between the positive x axis and the specified angle using n segments along the arc. A sector spanning a full turn is approximated with a regular polygon with n sides.
 	"""
 	
-	def iter_points():
-		for i in range(n):
-			t = i * util.tau / n
-			
-			yield math.cos(t), math.sin(t)
+	if abs(angle) >= util.tau:
+		return [(math.cos(t), math.sin(t)) for t in (i * util.tau / n for i in range(n))]
+	else:
+		return [(0, 0)] + [(math.cos(t), math.sin(t)) for t in (i * angle / n for i in range(n + 1))]
+
+
+def _sector_segment_count(angle, radius, tolerance):
+	"""
+	Return the number of segments needed to approximate an arc with the specified angle and radius so that the segments do not deviate from the arc by more than the specified tolerance.
+	"""
+	
+	# Angle spanned by a chord whose sagitta equals the tolerance.
+	max_angle = 2 * math.acos(max(1 - tolerance / radius, -1)) if radius else util.tau
+	min_count = 3 if abs(angle) >= util.tau else 1
+	
+	return max(math.ceil(abs(angle) / max_angle), min_count)
+
+
+class _Sector(_CompositePolygon):
+	"""
+	Special Polygon which represents a sector of the unit circle. The number of segments used to approximate the arc is chosen when the polygon is evaluated, based on the size the sector has after being transformed.
+	"""
+	
+	def __init__(self, angle, tolerance):
+		super().__init__()
+		
+		self._angle = angle
+		self._tolerance = tolerance
+	
+	@property
+	def _bounded(self):
+		return True
+	
+	def _has_approximations(self):
+		return True
+	
+	def _estimate_vertices(self):
+		# The actual number depends on the size of the sector. Assume as many segments as used by `circle()` by default.
+		return 64 + 2
+	
+	def _get_pyclipper_paths(self, tm : numpy.ndarray, evaluation : _Evaluation):
+		# Radius of the sector in the representation used for clipper. For a non-uniform scaling, the major axis of the resulting ellipse is used.
+		radius = numpy.linalg.norm(tm[:2, :2], 2)
+		n = _sector_segment_count(self._angle, radius, evaluation.scale * self._tolerance)
+		
+		return polygon(_sector_vertices(self._angle, n))._get_pyclipper_paths(tm, evaluation)
+	
+	def _get_extent(self, tm : numpy.ndarray):
+		return numpy.amax(numpy.abs(tm[:2, 2])) + numpy.linalg.norm(tm[:2, :2], 2)
+	
+	def _get_label(self):
+		return 'sector {}'.format(self._angle)
+
+
+def circle(n = None, *, tolerance = None):
+	"""
+	Return a polygon approximating the unit circle.
+	
+	`circle(n)`: Use a regular polygon with the specified number of sides.
+	`circle(tolerance = x)`: Choose the number of sides when the polygon is evaluated so that the sides deviate from the circle by at most `x`. The tolerance is given in the units of the coordinate system the polygon is finally rendered in, so the number of sides follows the size of the circle after all transformations.
+	
+	Without arguments, a regular polygon with 64 sides is used. Specifying both `n` and `tolerance` raises a ValueError.
+	"""
+	
+	if n is None and tolerance is None:
+		n = 64
+	
+	return arc(turns = 1, n = n, tolerance = tolerance)
+
+
+def arc(angle = None, *, turns = None, n = None, tolerance = None):
+	"""
+	Return a polygon approximating the sector of the unit circle which starts at the positive x axis and spans the specified angle in counter-clockwise direction.
+	
+	The angle is specified like for `rotate()`. If `n` is specified, the arc is approximated using that many segments. Otherwise, the number of segments is chosen like for `circle()` using the specified tolerance, which defaults to `default_tolerance`. Specifying both `n` and `tolerance` raises a ValueError.
+	"""
+	
+	if n is not None and tolerance is not None:
+		raise ValueError('Only one of n and tolerance can be specified.')
+	
+	if angle is None:
+		angle = util.tau * turns
+	
+	if n is not None:
+		return polygon(_sector_vertices(angle, n))
+	
+	if tolerance is None:
+		tolerance = default_tolerance
 	
-	return polygon(iter_points())
+	return _Sector(angle, tolerance)
 
 
 def square():
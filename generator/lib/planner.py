@@ -0,0 +1,209 @@
+# Annotations are not evaluated so that defining functions does not load numpy.
+from __future__ import annotations
+import functools
+from . import paths, util
+
+
+numpy = util.lazy_import('numpy')
+pyclipper = util.lazy_import('pyclipper')
+
+
+def _is_complement(polygon : paths.Polygon):
+	return isinstance(polygon, paths._CombinedPolygon) and polygon._operation == pyclipper.CT_DIFFERENCE and isinstance(polygon._left, paths._Plane)
+
+
+def _fold_balanced(operands, operation):
+	"""
+	Combine a non-empty list of polygons with an associative operation using a balanced tree, keeping the order of the operands.
+	"""
+	
+	if len(operands) == 1:
+		return operands[0]
+	
+	middle = len(operands) // 2
+	
+	return paths._CombinedPolygon(_fold_balanced(operands[:middle], operation), _fold_balanced(operands[middle:], operation), operation)
+
+
+class Planner:
+	"""
+	Rewrites a polygon expression into an equivalent expression which is cheaper to evaluate. The rewritten expression describes the same area, but as the operations are applied in a different order and to different operands, intersection points may be rounded differently. On the polyhedra in `src/polyhedra`, this changes the output of most generators, which is why polygons are not rewritten before they are evaluated unless `Polygon.optimized()` is used explicitly. These rewrites are applied:
+	
+	- Chains of unions, intersections and exclusive unions are flattened and recombined. Unions and exclusive unions are recombined as balanced trees, keeping the order of the operands. The operands of intersections are ordered so that operands with fewer vertices are intersected first.
+	- Complements are moved out of intersections (`~X & B` becomes `B / X`) and double complements are removed, using De Morgan's laws for complements of unions which contain complements.
+	- Intersections with a bounded operand are distributed over unions, exclusive unions and differences within the other operands, also through transformations, so that the unbounded parts of those operands are clipped early.
+	
+	Subexpressions which are used more than once are rewritten only once and chains are not flattened across them, so that the result of evaluating them is still shared.
+	"""
+	
+	def __init__(self, root : paths.Polygon):
+		# Number of polygons within the expression which use each polygon, by id(). Polygons which have already been rewritten as part of another expression are not visited.
+		self._parent_counts = { }
+		
+		# Bounded polygons transformed into the coordinate system of a transformed polygon they are distributed into, by the id() of both, so that the transformed polygon is shared by all operands it is distributed into. Both polygons are part of the expression and stay alive while it is rewritten.
+		self._transformed_bounded = { }
+		
+		visited = { id(root) }
+		stack = [root]
+		
+		while stack:
+			for i in stack.pop()._get_children():
+				self._parent_counts[id(i)] = self._parent_counts.get(id(i), 0) + 1
+				
+				if id(i) not in visited and i._cached_plan is None:
+					visited.add(id(i))
+					stack.append(i)
+	
+	def plan(self, polygon : paths.Polygon):
+		"""
+		Return the rewritten version of a polygon which is part of the expression.
+		
+		The result is stored with the polygon, so that every polygon is rewritten only once, even when it is part of multiple expressions. This keeps the results of evaluating the rewritten polygons shared between those expressions.
+		"""
+		
+		if polygon._cached_plan is None:
+			polygon._cached_plan = self._plan(polygon)
+		
+		return polygon._cached_plan
+	
+	def _is_shared(self, polygon : paths.Polygon):
+		return self._parent_counts.get(id(polygon), 0) > 1
+	
+	def _plan(self, polygon : paths.Polygon):
+		if isinstance(polygon, paths._CombinedPolygon) and polygon._operation != pyclipper.CT_DIFFERENCE:
+			# The operations within a chain are not rewritten individually.
+			operands = [self.plan(i) for i in self._flatten(polygon)]
+			
+			if polygon._operation == pyclipper.CT_INTERSECTION:
+				res = self._intersect(operands)
+			else:
+				res = _fold_balanced(operands, polygon._operation)
+		else:
+			children = polygon._get_children()
+			
+			if not children:
+				return polygon
+			
+			planned_children = [self.plan(i) for i in children]
+			
+			if any(i is not j for i, j in zip(children, planned_children)):
+				res = polygon._with_children(planned_children)
+			else:
+				res = polygon
+			
+			if _is_complement(res):
+				res = self._complement(res._right)
+		
+		# Keep the original instance if nothing changed so that its cached results are used.
+		if isinstance(res, paths._CombinedPolygon) and isinstance(polygon, paths._CombinedPolygon) and res._operation == polygon._operation and res._left is polygon._left and res._right is polygon._right:
+			return polygon
+		
+		return res
+	
+	def _flatten(self, polygon : paths._CombinedPolygon):
+		"""
+		Return the operands of the chain of operations of the same type starting at the specified polygon.
+		"""
+		
+		operation = polygon._operation
+		operands = []
+		stack = [polygon]
+		
+		while stack:
+			p = stack.pop()
+			
+			if p is polygon or (isinstance(p, paths._CombinedPolygon) and p._operation == operation and not _is_complement(p) and not self._is_shared(p)):
+				stack.append(p._right)
+				stack.append(p._left)
+			else:
+				operands.append(p)
+		
+		return operands
+	
+	def _complement(self, polygon : paths.Polygon):
+		"""
+		Return the rewritten complement of an already rewritten polygon.
+		"""
+		
+		if _is_complement(polygon):
+			return polygon._right
+		
+		if isinstance(polygon, paths._CombinedPolygon) and polygon._operation == pyclipper.CT_UNION:
+			operands = self._flatten(polygon)
+			
+			if any(_is_complement(i) for i in operands):
+				return self._intersect([self._complement(i) for i in operands])
+		
+		return paths._CombinedPolygon(paths._Plane(), polygon, pyclipper.CT_DIFFERENCE)
+	
+	def _intersect(self, operands):
+		"""
+		Return the rewritten intersection of a list of already rewritten polygons.
+		"""
+		
+		operands = [j for i in operands if not isinstance(i, paths._Plane) for j in (self._flatten(i) if isinstance(i, paths._CombinedPolygon) and i._operation == pyclipper.CT_INTERSECTION and not self._is_shared(i) else [i])]
+		complemented = [i._right for i in operands if _is_complement(i)]
+		operands = [i for i in operands if not _is_complement(i)]
+		
+		if not operands:
+			if not complemented:
+				return paths._Plane()
+			
+			return self._complement(_fold_balanced(complemented, pyclipper.CT_UNION))
+		
+		bounded = [i for i in operands if i._bounded]
+		
+		if bounded:
+			smallest = min(bounded, key = lambda x: x._vertex_estimate)
+			distributed = [None if i._bounded else self._distribute(i, smallest) for i in operands]
+			
+			# The bounded operand is not needed anymore if it was distributed into another operand.
+			if any(i is not None for i in distributed):
+				operands = [j if j is not None else i for i, j in zip(operands, distributed) if i is not smallest]
+		
+		if len(operands) > 2:
+			operands.sort(key = lambda x: x._vertex_estimate)
+		res = functools.reduce(lambda x, y: paths._CombinedPolygon(x, y, pyclipper.CT_INTERSECTION), operands)
+		
+		if complemented:
+			res = paths._CombinedPolygon(res, _fold_balanced(complemented, pyclipper.CT_UNION), pyclipper.CT_DIFFERENCE)
+		
+		return res
+	
+	def _distribute(self, polygon : paths.Polygon, bounded : paths.Polygon):
+		"""
+		Return the rewritten intersection of an already rewritten polygon with a bounded polygon where the intersection has been distributed into the operands of the first polygon or None, if this is not possible.
+		"""
+		
+		if isinstance(polygon, paths._TransformedPolygon):
+			if not numpy.linalg.det(polygon._tm):
+				return None
+			
+			key = id(polygon), id(bounded)
+			
+			if key not in self._transformed_bounded:
+				self._transformed_bounded[key] = paths._TransformedPolygon(bounded, numpy.linalg.inv(polygon._tm))
+			
+			res = self._distribute(polygon._polygon, self._transformed_bounded[key])
+			
+			if res is None:
+				return None
+			
+			return paths._TransformedPolygon(res, polygon._tm)
+		
+		if not isinstance(polygon, paths._CombinedPolygon) or _is_complement(polygon):
+			return None
+		
+		if polygon._operation == pyclipper.CT_DIFFERENCE:
+			return paths._CombinedPolygon(self._intersect([polygon._left, bounded]), polygon._right, pyclipper.CT_DIFFERENCE)
+		
+		if polygon._operation == pyclipper.CT_INTERSECTION:
+			return None
+		
+		operands = self._flatten(polygon)
+		
+		# The bounded polygon is intersected with each operand separately, which only pays off if it is small compared to the operands.
+		if len(operands) * bounded._vertex_estimate > polygon._vertex_estimate:
+			return None
+		
+		return _fold_balanced([self._intersect([i, bounded]) for i in operands], polygon._operation)
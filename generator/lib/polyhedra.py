@@ -1,5 +1,8 @@
-import json, numpy
-from . import linalg, paths
+import json
+from . import linalg, paths, util
+
+
+numpy = util.lazy_import('numpy')
 
 
 def _grab_view_cycle(view, fn):
@@ -32,6 +35,9 @@ class PolyhedronView:
 		self._next_view = None
 		self._opposite_view = None
 
+		# Cache for view_local_onb().
+		self._local_onb = None
+
 	@property
 	def polyhedron(self):
 		"""
@@ -157,14 +163,19 @@ def face_normal(view : PolyhedronView):
 def view_local_onb(view : PolyhedronView):
 	"""
 	Construct a view-local orthonormal basis of `R^3` for the given view.
+
+	The basis is computed once per view. The returned list must not be modified.
 	"""
 
-	a, b, c = [i.vertex_coordinate for i in [view, view.next, view.next.next]]
-	k1 = linalg.normalize(b - a)
-	k2 = linalg.normalize(numpy.cross(numpy.cross(b - a, c - b), k1))
-	k3 = linalg.normalize(numpy.cross(k1, k2))
+	if view._local_onb is None:
+		a, b, c = [i.vertex_coordinate for i in [view, view.next, view.next.next]]
+		k1 = linalg.normalize(b - a)
+		k2 = linalg.normalize(numpy.cross(numpy.cross(b - a, c - b), k1))
+		k3 = linalg.normalize(numpy.cross(k1, k2))
+
+		view._local_onb = [k1, k2, k3]
 
-	return [k1, k2, k3]
+	return view._local_onb
 
 
 def face_coordinate_system(view : PolyhedronView):
@@ -284,6 +295,13 @@ class Polyhedron:
 		
 		return self._vertices
 
+	def vertex_coordinate(self, vertex_id):
+		"""
+		The coordinate of the vertex with the specified identifier.
+		"""
+
+		return self._vertex_coordinates[vertex_id]
+
 	@property
 	def vertex_count(self):
 		"""
@@ -306,11 +324,20 @@ class Polyhedron:
 		return len(self.faces)
 	
 	@classmethod
-	def load_from_json(cls, path, scale=1):
-		with open(path, encoding = 'utf-8') as file:
-			data = json.load(file)
+	def from_json_data(cls, data, scale=1):
+		"""
+		Create a polyhedron from the data read from a JSON file, with the vertex coordinates multiplied by the specified scale.
+		"""
 
 		vertices = [scale * numpy.array(i) for i in data['vertices']]
 		faces = data['faces']
 		
 		return cls(vertices, faces)
+
+	@classmethod
+	@util.stage('load')
+	def load_from_json(cls, path, scale=1):
+		with open(path, encoding = 'utf-8') as file:
+			data = json.load(file)
+
+		return cls.from_json_data(data, scale)
@@ -0,0 +1,46 @@
+import json
+from . import polyhedra, stellations, util
+
+
+class Session:
+	"""
+	Data shared between generators which are run in the same process, e.g. by the batch entry point `python -m generate`.
+	
+	Each input file is read once and a polyhedron is created once for each file and scale. The local coordinate systems of the faces, which are cached on the views of the polyhedron, and the stellation structure computed for it are thus shared by all generators using the same polyhedron.
+	"""
+	
+	def __init__(self):
+		self._data = { }
+		self._polyhedra = { }
+		self._stellations = { }
+	
+	@util.stage('load')
+	def polyhedron(self, path, scale = 1) -> polyhedra.Polyhedron:
+		"""
+		Return the polyhedron loaded from the specified JSON file with its coordinates multiplied by the specified scale.
+		"""
+		
+		key = path, scale
+		polyhedron = self._polyhedra.get(key)
+		
+		if polyhedron is None:
+			data = self._data.get(path)
+			
+			if data is None:
+				data = self._data[path] = json.loads(util.read_text_file(path))
+			
+			polyhedron = self._polyhedra[key] = polyhedra.Polyhedron.from_json_data(data, scale)
+		
+		return polyhedron
+	
+	def stellation(self, polyhedron : polyhedra.Polyhedron) -> stellations.Stellation:
+		"""
+		Return the stellation structure shared by all users of the specified polyhedron.
+		"""
+		
+		stellation = self._stellations.get(polyhedron)
+		
+		if stellation is None:
+			stellation = self._stellations[polyhedron] = stellations.Stellation()
+		
+		return stellation
@@ -0,0 +1,188 @@
+"""
+Convex solids represented by the polygons of their faces, which are computed in Python instead of by evaluating CSG operations in OpenSCAD.
+"""
+
+from . import util
+
+
+numpy = util.lazy_import('numpy')
+
+
+# Half of the edge length of the box which is clipped to produce a solid, like `inf` in `src/_util.scad`.
+inf = 1e6
+
+# Distance from a plane below which vertices are considered to lie on the plane.
+plane_eps = 1e-9
+
+# Distance from a plane below which the vertices of a clipped solid are moved onto the plane.
+refine_eps = 1e-6
+
+
+class ConvexSolid:
+	"""
+	A convex solid given by a list of its faces. Each face is a tuple of vertices, each of which is a tuple of coordinates. The vertices are ordered counter-clockwise when viewed from outside of the solid.
+	
+	Vertices shared by several faces use identical coordinates, so that the faces can be joined into a mesh.
+	"""
+	
+	def __init__(self, faces):
+		self.faces = faces
+	
+	@property
+	def vertices(self):
+		return list(dict.fromkeys(j for i in self.faces for j in i))
+	
+	@util.stage('compute')
+	def clip(self, point, normal):
+		"""
+		Return the part of this solid on the side of the plane through the specified point opposite the specified normal vector, or None, if that part is empty or flat.
+		"""
+		
+		point = numpy.asarray(point, dtype = float)
+		normal = numpy.asarray(normal, dtype = float)
+		
+		distances = { i: float(numpy.dot(numpy.array(i) - point, normal)) for i in self.vertices }
+		
+		if all(i <= plane_eps for i in distances.values()):
+			return self
+		
+		if all(i >= -plane_eps for i in distances.values()):
+			return None
+		
+		def intersect(a, b):
+			# Compute the intersection with the vertices in a fixed order, so that both faces sharing the edge get the same coordinates.
+			a, b = sorted([a, b])
+			t = distances[a] / (distances[a] - distances[b])
+			
+			return tuple(float(i) for i in numpy.array(a) + t * (numpy.array(b) - numpy.array(a)))
+		
+		faces = []
+		cap_vertices = []
+		
+		for face in self.faces:
+			clipped_face = []
+			
+			for a, b in zip(face, face[1:] + face[:1]):
+				if distances[a] <= plane_eps:
+					clipped_face.append(a)
+					
+					if distances[a] >= -plane_eps:
+						cap_vertices.append(a)
+				
+				if (distances[a] < -plane_eps) != (distances[b] < -plane_eps) and max(distances[a], distances[b]) > plane_eps:
+					vertex = intersect(a, b)
+					
+					clipped_face.append(vertex)
+					cap_vertices.append(vertex)
+			
+			if len(clipped_face) >= 3:
+				faces.append(tuple(clipped_face))
+		
+		faces.append(_order_polygon(list(dict.fromkeys(cap_vertices)), normal))
+		
+		return ConvexSolid(faces)
+
+
+def _order_polygon(vertices, normal):
+	"""
+	Order the vertices of a convex polygon counter-clockwise when viewed from the direction of the specified normal vector.
+	"""
+	
+	coordinates = numpy.array(vertices)
+	center = numpy.mean(coordinates, axis = 0)
+	
+	# Any vector not parallel to the normal can be used to construct a basis of the plane.
+	u = numpy.cross(normal, numpy.eye(3)[numpy.argmin(numpy.abs(normal))])
+	v = numpy.cross(normal, u)
+	angles = numpy.arctan2(numpy.dot(coordinates - center, v), numpy.dot(coordinates - center, u))
+	
+	return tuple(vertices[i] for i in numpy.argsort(angles))
+
+
+def _get_box_half_spaces(size = inf):
+	"""
+	Return the half-spaces whose intersection is the cube returned by `box()`, in the form used by `intersect_half_spaces()`.
+	"""
+	
+	return [(sign * size * numpy.eye(3)[axis], sign * numpy.eye(3)[axis]) for axis in range(3) for sign in [-1, 1]]
+
+
+def box(size = inf):
+	"""
+	Return a cube centered at the origin with the specified half edge length.
+	"""
+	
+	def vertex(*signs):
+		return tuple(float(i * size) for i in signs)
+	
+	faces = []
+	
+	for axis in range(3):
+		for sign in [-1, 1]:
+			# Two vectors spanning the face, so that their cross product points outwards.
+			u = numpy.roll([0, sign, 0], axis)
+			v = numpy.roll([0, 0, 1], axis)
+			center = numpy.roll([sign, 0, 0], axis)
+			
+			faces.append(tuple(vertex(*(center + a * u + b * v)) for a, b in [(-1, -1), (1, -1), (1, 1), (-1, 1)]))
+	
+	return ConvexSolid(faces)
+
+
+def intersect_half_spaces(half_spaces):
+	"""
+	Return the intersection of the specified half-spaces, each given as a tuple of a point on its boundary and a normal vector pointing out of the half-space, or None if the intersection is empty or flat.
+	
+	Like the intersections of `half_space()` in `src/_util.scad`, unbounded intersections are clipped to the box returned by `box()`.
+	"""
+	
+	half_spaces = [(numpy.asarray(p, dtype = float), numpy.asarray(n, dtype = float)) for p, n in half_spaces]
+	solid = box()
+	
+	for point, normal in half_spaces:
+		solid = solid.clip(point, normal)
+		
+		if solid is None:
+			return None
+	
+	# Vertices on the boundary of the box are refined as well.
+	return _refine(solid, half_spaces + _get_box_half_spaces())
+
+
+def _refine(solid, half_spaces):
+	"""
+	Recompute the vertices of the specified solid as the intersection of the planes of the half-spaces they lie on.
+	
+	The vertices computed by clipping the large box have rounding errors proportional to the size of the box. Vertices which do not lie on at least 3 independent planes are left unchanged.
+	"""
+	
+	refined_vertices = { }
+	
+	for vertex in solid.vertices:
+		planes = [(n, numpy.dot(p, n)) for p, n in half_spaces if abs(numpy.dot(numpy.array(vertex) - p, n)) < refine_eps]
+		refined_vertex = vertex
+		
+		if planes:
+			normals, offsets = zip(*planes)
+			solution, _, rank, _ = numpy.linalg.lstsq(numpy.array(normals), numpy.array(offsets), rcond = None)
+			
+			if rank == 3:
+				refined_vertex = tuple(float(i) for i in solution)
+		
+		refined_vertices[vertex] = refined_vertex
+	
+	return ConvexSolid([tuple(refined_vertices[j] for j in i) for i in solid.faces])
+
+
+def get_mesh(solid : ConvexSolid):
+	"""
+	Return the vertices of the specified solid as a list and its faces as a list of lists of vertex indices ordered counter-clockwise when viewed from outside.
+	"""
+	
+	indices = { }
+	faces = []
+	
+	for face in solid.faces:
+		faces.append([indices.setdefault(i, len(indices)) for i in face])
+	
+	return [list(i) for i in indices], faces
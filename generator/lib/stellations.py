@@ -1,14 +1,26 @@
-import functools, numpy, operator
-from lib import polyhedra, paths, linalg
+import functools, operator
+from lib import polyhedra, paths, linalg, util
+
+
+numpy = util.lazy_import('numpy')
 
 
 class Stellation:
 	"""
 	Represents the (first, inner-most) stellation structure
 	over a given polyhedron.
+
+	The cones and cells are computed once per view, so that
+	instances can be shared by all users of the same polyhedron.
 	"""
 
 
+	def __init__(self):
+		# Results of cones() and cells() by view.
+		self._cones = { }
+		self._cells = { }
+
+
 	def _compute_stellation(self, polyview : polyhedra.PolyhedronView, closed : bool = True):
 		"""
 		Compute the edges of a stellation cell as the intersections
@@ -107,14 +119,17 @@ class Stellation:
 
 		:param polyview: A view on the polyhedron.
 		"""
-		cones = []
+		if polyview not in self._cones:
+			cones = []
+
+			for view in polyview.face_cycle:
+				lines = self._cone_over_edge(view)
+				lines = self._line_to_face_coordinates(polyview, lines)
+				cones.append(self._compute_halfplanes(lines))
 
-		for view in polyview.face_cycle:
-			lines = self._cone_over_edge(view)
-			lines = self._line_to_face_coordinates(polyview, lines)
-			cones.append(self._compute_halfplanes(lines))
+			self._cones[polyview] = cones
 
-		return cones
+		return self._cones[polyview]
 
 
 	def cells(self, polyview : polyhedra.PolyhedronView):
@@ -125,14 +140,17 @@ class Stellation:
 
 		:param polyview: A view on the polyhedron.
 		"""
-		cells = []
+		if polyview not in self._cells:
+			cells = []
+
+			for view in polyview.face_cycle:
+				lines = self._cell_over_edge(view)
+				lines = self._line_to_face_coordinates(polyview, lines)
+				cells.append(self._compute_halfplanes(lines))
 
-		for view in polyview.face_cycle:
-			lines = self._cell_over_edge(view)
-			lines = self._line_to_face_coordinates(polyview, lines)
-			cells.append(self._compute_halfplanes(lines))
+			self._cells[polyview] = cells
 
-		return cells
+		return self._cells[polyview]
 
 
 	def stellation(self, polyview : polyhedra.PolyhedronView):
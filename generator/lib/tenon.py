@@ -1,5 +1,8 @@
-import functools, numpy, operator, abc
-from lib import polyhedra, stellations, paths, linalg
+import functools, operator, abc
+from lib import polyhedra, stellations, paths, linalg, util
+
+
+numpy = util.lazy_import('numpy')
 
 
 class Tenon(metaclass = abc.ABCMeta):
@@ -8,8 +11,11 @@ class Tenon(metaclass = abc.ABCMeta):
 	tenon structure along an edge of a polyhedron.
 	"""
 
-	def __init__(self):
-		self._stellation = stellations.Stellation()
+	def __init__(self, stellation = None):
+		"""
+		:param stellation: The stellation structure used to compute the cones over the edges. Can be shared between tenons of the same polyhedron.
+		"""
+		self._stellation = stellations.Stellation() if stellation is None else stellation
 
 
 	def _fingers(self, polyview):
@@ -170,14 +176,15 @@ class RegularFingerTenon(Tenon):
 	The number of fingers per edge is globally constant.
 	"""
 
-	def __init__(self, thickness=0.08, finger_count=8):
+	def __init__(self, thickness=0.08, finger_count=8, stellation=None):
 		"""
 		:param polyhedron: The underlying polyhedron.
 		:param thickness: The thickness of the material.
 		:param finger_count: The sum of fingers and slots.
+		:param stellation: See Tenon.__init__().
 		"""
 
-		super().__init__()
+		super().__init__(stellation)
 
 		self._thickness = thickness
 		self._finger_count = finger_count
@@ -199,11 +206,12 @@ class NullTenon(Tenon):
 	The null tenon represents a simple straight edge.
 	"""
 
-	def __init__(self, thickness=0.08):
+	def __init__(self, thickness=0.08, stellation=None):
 		"""
 		:param thickness: The thickness of the material.
+		:param stellation: See Tenon.__init__().
 		"""
-		super().__init__()
+		super().__init__(stellation)
 		self._thickness = thickness
 
 	def fingers(self, polyview):
@@ -0,0 +1,217 @@
+import os, json, time, functools, contextlib
+from . import util
+
+
+csv = util.lazy_import('csv')
+
+
+# Name of the environment variable which selects the directory traces of the Clipper operations run by the generators are written to. See `traced()`.
+trace_dir_variable = 'GENERATOR_TRACE_DIR'
+
+
+class ClipperEvent:
+	"""
+	A Clipper operation recorded while tracing was enabled.
+	"""
+	
+	def __init__(self, operation, subject_vertex_count, clip_vertex_count, output_vertex_count, start_time, duration, context):
+		# One of 'union', 'intersection', 'difference', 'xor' or 'offset'.
+		self.operation = operation
+		
+		self.subject_vertex_count = subject_vertex_count
+		self.clip_vertex_count = clip_vertex_count
+		self.output_vertex_count = output_vertex_count
+		
+		# Value of `time.perf_counter()` when the operation was started and its duration in seconds.
+		self.start_time = start_time
+		self.duration = duration
+		
+		# Labels set using `trace_context()` while the operation was run.
+		self.context = context
+
+
+class ClipperTrace:
+	"""
+	Collects the Clipper operations run while it is active. Instances are created by `tracing()`.
+	"""
+	
+	def __init__(self):
+		self.start_time = time.perf_counter()
+		self.events = []
+	
+	def stats(self):
+		"""
+		Return counters aggregated over the recorded operations, in the same form as `stats()`.
+		"""
+		
+		counters = { }
+		
+		for i in self.events:
+			_count_event(counters, i)
+		
+		return _get_stats(counters)
+	
+	def write_csv(self, file):
+		"""
+		Write the recorded operations to the specified text file as CSV with one row per operation. Times are in seconds relative to the start of the trace.
+		"""
+		
+		context_keys = sorted(set(j for i in self.events for j in i.context))
+		writer = csv.writer(file)
+		writer.writerow(['operation', 'subject_vertices', 'clip_vertices', 'output_vertices', 'start', 'duration'] + context_keys)
+		
+		for i in self.events:
+			writer.writerow([i.operation, i.subject_vertex_count, i.clip_vertex_count, i.output_vertex_count, i.start_time - self.start_time, i.duration] + [i.context.get(j, '') for j in context_keys])
+	
+	def write_chrome_trace(self, file):
+		"""
+		Write the recorded operations to the specified text file in the Trace Event Format, which can be loaded by chrome://tracing or Perfetto.
+		"""
+		
+		def get_event(event):
+			return dict(
+				name = event.operation,
+				cat = 'clipper',
+				ph = 'X',
+				ts = (event.start_time - self.start_time) * 1e6,
+				dur = event.duration * 1e6,
+				pid = 0,
+				tid = 0,
+				args = dict(
+					event.context,
+					subject_vertices = event.subject_vertex_count,
+					clip_vertices = event.clip_vertex_count,
+					output_vertices = event.output_vertex_count))
+		
+		json.dump({ 'traceEvents': [get_event(i) for i in self.events], 'displayTimeUnit': 'ms' }, file)
+
+
+# Traces which are currently active, innermost last.
+_active_traces = []
+
+# Labels attached to recorded operations, set by trace_context().
+_trace_context = { }
+
+# Counters for all operations recorded since the program was started, by operation.
+_counters = { }
+
+
+def _count_event(counters, event : ClipperEvent):
+	counter = counters.setdefault(event.operation, [0, 0, 0, 0, 0.0])
+	
+	for i, v in enumerate([1, event.subject_vertex_count, event.clip_vertex_count, event.output_vertex_count, event.duration]):
+		counter[i] += v
+
+
+def _get_stats(counters):
+	def get_counter(counter):
+		count, subject_vertices, clip_vertices, output_vertices, time = counter
+		
+		return dict(count = count, subject_vertices = subject_vertices, clip_vertices = clip_vertices, output_vertices = output_vertices, time = time)
+	
+	stats = { k: get_counter(v) for k, v in counters.items() }
+	stats['total'] = get_counter([sum(i) for i in zip([0, 0, 0, 0, 0.0], *counters.values())])
+	
+	return stats
+
+
+def record(operation, subject_paths, clip_paths, solution, start_time):
+	"""
+	Record a Clipper operation with all active traces. Does nothing if tracing is not enabled.
+	"""
+	
+	if _active_traces:
+		end_time = time.perf_counter()
+		
+		event = ClipperEvent(
+			operation,
+			sum(len(i) for i in subject_paths),
+			sum(len(i) for i in clip_paths),
+			sum(len(i) for i in solution),
+			start_time,
+			end_time - start_time,
+			_trace_context)
+		
+		_count_event(_counters, event)
+		
+		for i in _active_traces:
+			i.events.append(event)
+
+
+def stats():
+	"""
+	Return counters for all Clipper operations which were recorded while tracing was enabled.
+	
+	The result is a dict with an entry for each kind of operation and an entry `'total'`. Each entry is a dict with the number of operations run, the total numbers of vertices of the subject, clip and output paths and the total time in seconds spent in the operations.
+	"""
+	
+	return _get_stats(_counters)
+
+
+@contextlib.contextmanager
+def tracing():
+	"""
+	Context manager which records all Clipper operations run within it and yields a `ClipperTrace` instance receiving them. Tracing is disabled otherwise, as it slows down evaluation.
+	"""
+	
+	trace = ClipperTrace()
+	_active_traces.append(trace)
+	
+	try:
+		yield trace
+	finally:
+		_active_traces.remove(trace)
+
+
+@contextlib.contextmanager
+def trace_context(**labels):
+	"""
+	Context manager which attaches the specified labels (e.g. the name of the generator or the ID of a face) to all Clipper operations recorded within it.
+	
+	As polygons are evaluated lazily, the labels must be set where the polygon is used, not where it is created.
+	"""
+	
+	global _trace_context
+	
+	saved_context = _trace_context
+	_trace_context = dict(saved_context, **labels)
+	
+	try:
+		yield
+	finally:
+		_trace_context = saved_context
+
+
+def traced(generator_name):
+	"""
+	Decorator for the main function of a generator, which is called with the path to the input file.
+	
+	Operations run by the function are labeled with the name of the generator and the name of the input file. If the environment variable GENERATOR_TRACE_DIR is set, all operations are traced and the trace is written to the files `<generator>-<input>.csv` and `<generator>-<input>.json` in that directory.
+	"""
+	
+	def decorator(fn):
+		@functools.wraps(fn)
+		def wrapped_fn(src_path):
+			trace_dir = os.environ.get(trace_dir_variable)
+			name, _ = os.path.splitext(os.path.basename(src_path))
+			
+			with trace_context(generator = generator_name, input = name):
+				if not trace_dir:
+					return fn(src_path)
+				
+				with tracing() as trace:
+					result = fn(src_path)
+			
+			base_path = os.path.join(trace_dir, '{}-{}'.format(generator_name, name))
+			
+			with util.writing_text_file(base_path + '.csv') as file:
+				trace.write_csv(file)
+			
+			with util.writing_text_file(base_path + '.json') as file:
+				trace.write_chrome_trace(file)
+			
+			return result
+		
+		return wrapped_fn
+	
+	return decorator
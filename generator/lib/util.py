@@ -1,4 +1,30 @@
-import sys, os, math, contextlib, inspect
+import io, sys, os, math, time, contextlib, functools, importlib.util
+
+
+def lazy_import(name):
+	"""
+	Return the module with the specified name, which is only actually loaded when one of its attributes is first accessed.
+	
+	Used for modules which take long to load but are not needed by all users of a module, e.g. `numpy` by a generator whose output is already up to date. The returned module must not be used at module level of the importing module, e.g. in annotations or constants, as that would load it immediately.
+	"""
+	
+	module = sys.modules.get(name)
+	
+	if module is None:
+		spec = importlib.util.find_spec(name)
+		
+		if spec is None:
+			raise ModuleNotFoundError('No module named {!r}'.format(name), name = name)
+		
+		spec.loader = importlib.util.LazyLoader(spec.loader)
+		module = sys.modules[name] = importlib.util.module_from_spec(spec)
+		spec.loader.exec_module(module)
+	
+	return module
+
+
+cProfile = lazy_import('cProfile')
+tracemalloc = lazy_import('tracemalloc')
 
 
 # "We get further from truth when we obscure what we say." -- https://www.youtube.com/watch?v=FtxmFlMLYRI
@@ -18,16 +44,85 @@ class UserError(Exception):
 		super().__init__(message.format(*args))
 
 
-def main(fn):
+# Name of the environment variable which selects a profiler the main functions are run under. Supported values are `cprofile` and `tracemalloc`. Nothing is profiled if the variable is not set.
+profile_variable = 'GENERATOR_PROFILE'
+
+# Name of the environment variable which holds the path of the file produced by the current invocation. Profiles are written to the same directory.
+output_path_variable = 'GENERATOR_OUTPUT'
+
+
+def _get_profile_path(name, input_path, output_path, extension):
+	if input_path is not None:
+		input_name, _ = os.path.splitext(os.path.basename(input_path))
+		name = '{}-{}'.format(name, input_name)
+	
+	return os.path.join(os.path.dirname(output_path) if output_path else '.', name + extension)
+
+
+@contextlib.contextmanager
+def profiling(name, input_path, output_path):
+	"""
+	Context manager which runs its body under the profiler selected by the GENERATOR_PROFILE environment variable and writes the result to a file named after the specified name and the name of the input file. The file is written to the directory of the output file, if one is given, or to the current directory.
+	"""
+	
+	profiler = os.environ.get(profile_variable)
+	
+	if not profiler:
+		yield
+	elif profiler == 'cprofile':
+		path = _get_profile_path(name, input_path, output_path, '.pstats')
+		profile = cProfile.Profile()
+		profile.enable()
+		
+		try:
+			yield
+		finally:
+			profile.disable()
+			profile.dump_stats(path)
+			log('Profile written to {}.', path)
+	elif profiler == 'tracemalloc':
+		path = _get_profile_path(name, input_path, output_path, '.tracemalloc')
+		tracemalloc.start()
+		
+		try:
+			yield
+		finally:
+			_, peak = tracemalloc.get_traced_memory()
+			tracemalloc.take_snapshot().dump(path)
+			tracemalloc.stop()
+			log('Peak memory usage was {:.1f} MiB, snapshot written to {}.', peak / (1 << 20), path)
+	else:
+		raise UserError('Unknown profiler selected by {}: {}', profile_variable, profiler)
+
+
+def main(fn = None, *, profile = True):
 	"""
 	Decorator for "main" functions. Decorates a function that should be called when the containing module is run as a script (e.g. via python -m <module>).
+	
+	If the environment variable GENERATOR_PROFILE is set to `cprofile` or `tracemalloc`, the function is run under the respective profiler and a `.pstats` file or a snapshot of the allocated memory is written to the directory of the file named by the GENERATOR_OUTPUT environment variable (or the current directory), named after the module and the input file. With `@main(profile = False)`, the function is not profiled as a whole, because it profiles its parts itself using `profiling()`.
 	"""
 	
-	frame = inspect.currentframe().f_back
+	if fn is None:
+		# The partial object does not add a Python frame, so the frame of the containing module is still found below.
+		return functools.partial(main, profile = profile)
+	
+	frame = sys._getframe(1)
+	spec = frame.f_globals.get('__spec__')
+	
+	if spec is None:
+		name, _ = os.path.splitext(os.path.basename(frame.f_globals.get('__file__', fn.__name__)))
+	else:
+		# When a package is run, the name is the one of its __main__ module.
+		name, _, _ = spec.name.partition('.__main__')
+		_, _, name = name.rpartition('.')
 	
 	def wrapped_fn(*args, **kwargs):
 		try:
-			fn(*args, **kwargs)
+			if profile:
+				with profiling(name, args[0] if args else None, os.environ.get(output_path_variable)):
+					fn(*args, **kwargs)
+			else:
+				fn(*args, **kwargs)
 		except UserError as e:
 			log('Error: {}', e)
 			sys.exit(1)
@@ -46,13 +141,85 @@ def empty_context():
 	yield
 
 
+class Metrics:
+	"""
+	Measurements collected while `collecting_metrics()` is active.
+	"""
+	
+	def __init__(self):
+		# Wall time in seconds spent in each stage, excluding time spent in stages nested within it.
+		self.stage_times = { }
+		
+		# Values added using `count()`, by name.
+		self.counters = { }
+
+
+# The instance currently collecting metrics, if any.
+_metrics = None
+
+# For each active stage, a list of its name, its start time and the time spent in stages nested within it.
+_stage_stack = []
+
+
+@contextlib.contextmanager
+def collecting_metrics():
+	"""
+	Context manager which yields a Metrics instance receiving the times of all stages entered and all values counted within it.
+	"""
+	
+	global _metrics
+	
+	saved_metrics = _metrics
+	_metrics = Metrics()
+	
+	try:
+		yield _metrics
+	finally:
+		_metrics = saved_metrics
+
+
+@contextlib.contextmanager
+def stage(name):
+	"""
+	Context manager which marks its body as part of the specified stage (e.g. `'load'`, `'compute'` or `'export'`). Stages can be nested, time spent in a nested stage is only counted for that stage. Can also be used as a decorator.
+	
+	Does nothing unless `collecting_metrics()` is active.
+	"""
+	
+	if _metrics is None:
+		yield
+	else:
+		entry = [name, time.perf_counter(), 0.0]
+		_stage_stack.append(entry)
+		
+		try:
+			yield
+		finally:
+			_stage_stack.pop()
+			duration = time.perf_counter() - entry[1]
+			_metrics.stage_times[name] = _metrics.stage_times.get(name, 0.0) + duration - entry[2]
+			
+			if _stage_stack:
+				_stage_stack[-1][2] += duration
+
+
+def count(name, value = 1):
+	"""
+	Add the specified value to the counter with the specified name, if `collecting_metrics()` is active.
+	"""
+	
+	if _metrics is not None:
+		_metrics.counters[name] = _metrics.counters.get(name, 0) + value
+
+
 @contextlib.contextmanager
 def _temp_file_path(path):
 	temp_path = path + '~'
 	dir_path = os.path.dirname(path)
 	
-	if not os.path.exists(dir_path):
-		os.makedirs(dir_path)
+	# Another process may create the directory concurrently.
+	if dir_path:
+		os.makedirs(dir_path, exist_ok = True)
 	
 	yield temp_path
 	
@@ -99,6 +266,22 @@ def writing_text_file(path):
 		os.fsync(file.buffer.fileno())
 
 
+def output_file():
+	"""
+	Return a text file to which a generator writes its output, which can be read using `get_output_data()`.
+	
+	Like `sys.stdout`, which is used when a generator is run directly, binary data can be written to the `buffer` attribute of the file, after flushing it.
+	"""
+	
+	return io.TextIOWrapper(io.BytesIO(), encoding = 'utf-8', newline = '\n')
+
+
+def get_output_data(file : io.TextIOWrapper) -> bytes:
+	file.flush()
+	
+	return file.buffer.getvalue()
+
+
 def write_file(path, data : bytes):
 	with writing_file(path) as file:
 		file.write(data)
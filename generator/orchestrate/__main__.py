@@ -0,0 +1,203 @@
+import os, sys, json, math, time, heapq, asyncio
+from lib import util
+from . import rules
+
+
+# File in which the list of generated files and the durations of the jobs are kept between builds.
+state_path = '.cache/orchestrate.json'
+
+# Name of the environment variable which sets the number of jobs run in parallel. Defaults to the number of CPUs.
+jobs_variable = 'ORCHESTRATE_JOBS'
+
+
+def _read_state():
+	if not os.path.exists(state_path):
+		return dict()
+	
+	return json.loads(util.read_text_file(state_path))
+
+
+def _write_state(state):
+	os.makedirs(os.path.dirname(state_path), exist_ok = True)
+	util.write_text_file(state_path, json.dumps(state, indent = 1, sort_keys = True))
+
+
+def _get_goal_targets(goal_names, jobs, goals):
+	targets = []
+	
+	for i in goal_names or ['all']:
+		if i in goals:
+			targets.extend(goals[i])
+		elif i in jobs or os.path.exists(i):
+			targets.append(i)
+		else:
+			raise util.UserError('No rule to make target: {}', i)
+	
+	return targets
+
+
+def _get_needed_jobs(targets, jobs):
+	"""
+	Return the set of jobs needed to produce the specified targets, including the jobs producing their sources and order dependencies, and a dict mapping each of these jobs to the set of jobs which must be finished before it is run.
+	"""
+	
+	prerequisites = { }
+	stack = [jobs[i] for i in targets if i in jobs]
+	
+	while stack:
+		job = stack.pop()
+		
+		if job in prerequisites:
+			continue
+		
+		prerequisites[job] = set(jobs[i] for i in job.sources + job.order_dependencies if i in jobs) - { job }
+		stack.extend(prerequisites[job])
+	
+	return prerequisites
+
+
+async def _run_jobs(jobs):
+	"""
+	Run a single job or several batchable jobs with a single command, printing its output line by line prefixed with the name of the job, and return whether it succeeded.
+	"""
+	
+	job, *_ = jobs
+	prefix = job.name if len(jobs) == 1 else job.tool
+	
+	for i in jobs:
+		print('[{}] {}'.format(i.tool, i.name), flush = True)
+		
+		for j in i.targets:
+			if os.path.dirname(j):
+				os.makedirs(os.path.dirname(j), exist_ok = True)
+	
+	command = job.command + [j for i in jobs for j in i.arguments]
+	
+	try:
+		process = await asyncio.create_subprocess_exec(*command, env = dict(os.environ, **job.environment), stdout = asyncio.subprocess.PIPE, stderr = asyncio.subprocess.STDOUT)
+	except OSError as e:
+		util.log('{}: Error running {}: {}', prefix, command[0], e)
+		
+		return False
+	
+	async for line in process.stdout:
+		sys.stdout.write('{}: {}'.format(prefix, line.decode(errors = 'replace')))
+		sys.stdout.flush()
+	
+	return await process.wait() == 0
+
+
+def _pop_batch(ready, free_slots):
+	"""
+	Remove the job with the longest expected duration from the heap of ready jobs and return it, together with other jobs which can be run by the same command, if it is batchable.
+	
+	The batchable jobs are spread over the free slots so that batching does not reduce the number of commands run in parallel.
+	"""
+	
+	_, _, job = heapq.heappop(ready)
+	
+	if not job.batchable:
+		return [job]
+	
+	def is_compatible(other):
+		return other.batchable and other.command == job.command and other.environment == job.environment
+	
+	compatible = [i for i in ready if is_compatible(i[2])]
+	batch_size = min(rules.max_batch_size, math.ceil((len(compatible) + 1) / free_slots))
+	batch = sorted(compatible)[:batch_size - 1]
+	
+	ready[:] = [i for i in ready if i not in batch]
+	heapq.heapify(ready)
+	
+	return [job] + [i for _, _, i in batch]
+
+
+async def _run(prerequisites, parallel_jobs, durations):
+	"""
+	Run the specified jobs, which are keys of the dict `prerequisites`, respecting the prerequisites of each job, with at most the specified number of commands running at the same time. Returns the names of the jobs which failed.
+	
+	Of the jobs which are ready to run, the ones with the longest durations recorded in the specified dict are started first. Jobs without a recorded duration are started before all others. The dict is updated with the durations of the jobs run.
+	"""
+	
+	waiting = { k: set(v) for k, v in prerequisites.items() }
+	dependents = { i: [] for i in prerequisites }
+	
+	for job, job_prerequisites in prerequisites.items():
+		for i in job_prerequisites:
+			dependents[i].append(job)
+	
+	# Heap of tuples of the negated expected duration, a counter and the job, of jobs which can be started.
+	ready = []
+	running = { }
+	failed = []
+	counter = 0
+	
+	def finish(job):
+		for i in dependents[job]:
+			waiting[i].discard(job)
+			
+			if not waiting[i]:
+				make_ready(i)
+	
+	def make_ready(job):
+		nonlocal counter
+		
+		if job.is_outdated():
+			heapq.heappush(ready, (-durations.get(job.name, float('inf')), counter, job))
+			counter += 1
+		else:
+			finish(job)
+	
+	for job, job_prerequisites in prerequisites.items():
+		if not job_prerequisites:
+			make_ready(job)
+	
+	while ready or running:
+		# No new jobs are started after a job failed, like make without -k.
+		while ready and len(running) < parallel_jobs and not failed:
+			batch = _pop_batch(ready, parallel_jobs - len(running))
+			running[asyncio.ensure_future(_run_jobs(batch))] = batch, time.perf_counter()
+		
+		if not running:
+			break
+		
+		done, _ = await asyncio.wait(running, return_when = asyncio.FIRST_COMPLETED)
+		
+		for i in done:
+			batch, start_time = running.pop(i)
+			
+			for job in batch:
+				if i.result():
+					# The time of a batch is attributed evenly to its jobs.
+					durations[job.name] = (time.perf_counter() - start_time) / len(batch)
+					finish(job)
+				else:
+					failed.append(job.name)
+	
+	return failed
+
+
+@util.main
+def main(*goal_names):
+	"""
+	Build the specified goals of the makefile or individual files, without using make.
+	
+	Usage: python -m orchestrate [<goal or file> ...]
+	
+	Follows the same rules as the makefile, but the list of generated files is only produced again when generate_sources.sh or the list of input files changes. Commands are run in parallel, by default one per CPU, which can be changed by setting the environment variable ORCHESTRATE_JOBS. The output of each command is printed as it is produced. Commands which took longest in earlier builds are started first. Asymptote files are compiled in batches, as long as this leaves enough commands to run in parallel. Must be run from the directory containing the makefile.
+	"""
+	
+	parallel_jobs = int(os.environ.get(jobs_variable) or os.cpu_count() or 1)
+	state = _read_state()
+	generated_files = rules.get_generated_files(state)
+	jobs, goals = rules.get_jobs(rules.read_settings(), generated_files)
+	prerequisites = _get_needed_jobs(_get_goal_targets(goal_names, jobs, goals), jobs)
+	durations = state.setdefault('durations', { })
+	
+	try:
+		failed = asyncio.run(_run(prerequisites, parallel_jobs, durations))
+	finally:
+		_write_state(state)
+	
+	if failed:
+		raise util.UserError('Failed to build: {}', ', '.join(failed))
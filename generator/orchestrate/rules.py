@@ -0,0 +1,244 @@
+import os, sys, re, hashlib, functools, subprocess, importlib.util
+from lib import util
+
+
+# Files which may affect the result of all build products, like GLOBAL_DEPS in the makefile.
+global_dependencies = ['Makefile', 'config.mk', 'settings.mk']
+
+# Defaults for the variables which can be set in config.mk and settings.mk.
+default_settings = dict(INKSCAPE = 'inkscape', OPENSCAD = 'openscad', PYTHON = 'python2', ASYMPTOTE = 'asy', DXF_FLATNESS = '0.1', FLAT_SCAD_FILES = '')
+
+# Name of the job which generates all files listed by generate_sources.sh.
+generate_job_name = 'generated'
+
+# Maximum number of jobs of tools which accept several pairs of source and target files which are run by a single command.
+max_batch_size = 8
+
+# Directory of the `lib` package used by the wrappers in `support`, which contains the parser for dependency files.
+_support_lib_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'support', 'lib')
+
+
+@functools.lru_cache(None)
+def _get_support_make():
+	"""
+	Return the module `make` of the `lib` package in `support`, which is loaded from its path, as it is not on the module search path of the generator and its name clashes with the generator's own `lib` package.
+	"""
+	
+	spec = importlib.util.spec_from_file_location('support_lib', os.path.join(_support_lib_path, '__init__.py'), submodule_search_locations = [_support_lib_path])
+	package = sys.modules[spec.name] = importlib.util.module_from_spec(spec)
+	spec.loader.exec_module(package)
+	
+	return importlib.import_module(spec.name + '.make')
+
+
+def read_settings():
+	"""
+	Return the variables set in config.mk and settings.mk, with defaults for the ones not set.
+	
+	Only simple assignments are supported. Variables referencing other variables are rejected, as the makefile has to be used to evaluate them.
+	"""
+	
+	settings = dict(default_settings)
+	
+	for path in ['config.mk', 'settings.mk']:
+		if not os.path.exists(path):
+			continue
+		
+		for line in util.read_text_file(path).splitlines():
+			line = line.partition('#')[0].strip()
+			
+			if not line:
+				continue
+			
+			match = re.fullmatch('([A-Za-z_][A-Za-z0-9_]*)\\s*([:?+]?=)\\s*(.*)', line)
+			
+			if match is None or '$' in match.group(3):
+				raise util.UserError('{}: Unsupported line, use make instead: {}', path, line)
+			
+			name, operator, value = match.groups()
+			
+			if operator == '+=':
+				settings[name] = ' '.join(i for i in [settings.get(name, ''), value] if i)
+			elif operator != '?=' or name not in settings:
+				settings[name] = value
+	
+	return settings
+
+
+def _find_files(root):
+	"""
+	Return the paths of all files in the specified directory, skipping files and directories whose names start with a `.` or contain a space, like the `find` command in the makefile.
+	"""
+	
+	def is_ignored(name):
+		return name.startswith('.') or ' ' in name
+	
+	files = []
+	
+	for dir_path, dir_names, file_names in os.walk(root):
+		dir_names[:] = [i for i in dir_names if not is_ignored(i)]
+		files.extend(os.path.join(dir_path, i) for i in file_names if not is_ignored(i))
+	
+	return files
+
+
+def _get_generated_files_key():
+	"""
+	Return a key which changes when the list of files printed by generate_sources.sh might change. The script iterates over the files in src/polyhedra.
+	"""
+	
+	hash = hashlib.sha256(util.read_file('generate_sources.sh'))
+	hash.update('\n'.join(sorted(os.listdir('src/polyhedra'))).encode())
+	
+	return hash.hexdigest()
+
+
+def get_generated_files(state):
+	"""
+	Return the names of the files generated by generate_sources.sh.
+	
+	The list is stored in the specified dict, which is persisted between builds, and only produced again by running the script when it or the list of input files changed.
+	"""
+	
+	key = _get_generated_files_key()
+	entry = state.get('generated_files')
+	
+	if entry is None or entry['key'] != key:
+		files = subprocess.run(['./generate_sources.sh'], stdout = subprocess.PIPE, check = True).stdout.decode().splitlines()
+		entry = state['generated_files'] = dict(key = key, files = files)
+	
+	return entry['files']
+
+
+def read_dependencies(path):
+	"""
+	Return the files listed as prerequisites in a dependency file written by OpenSCAD or the wrappers in `support` or the generators, or None, if the file does not exist.
+	"""
+	
+	if not os.path.exists(path):
+		return None
+	
+	support_make = _get_support_make()
+	
+	# The parser reports errors using the exception class of the `lib` package in `support`.
+	try:
+		rules = support_make.parse_dependencies(util.read_text_file(path))
+	except support_make.util.UserError as e:
+		raise util.UserError('{}: {}', path, e)
+	
+	return [i for _, prerequisites in rules for i in prerequisites]
+
+
+class Job:
+	"""
+	A command which produces one or more targets, corresponding to a rule in the makefile.
+	"""
+	
+	def __init__(self, name, tool, targets, command, arguments, environment, sources, order_dependencies, batchable = False):
+		# Name used to refer to the job in messages and to store its duration.
+		self.name = name
+		
+		# Name of the tool shown in messages, like the makefile does.
+		self.tool = tool
+		self.targets = targets
+		
+		# The command run is the concatenation of these two lists. Jobs which are batchable and use the same command and environment can be run together by passing the arguments of all of them.
+		self.command = command
+		self.arguments = arguments
+		self.batchable = batchable
+		
+		# Environment variables set in addition to the ones of this process.
+		self.environment = environment
+		
+		# Files which the targets are compared to, in addition to the files listed in their dependency files.
+		self.sources = sources
+		
+		# Files which must exist before the command is run but which do not cause the targets to be updated.
+		self.order_dependencies = order_dependencies
+	
+	def is_outdated(self):
+		"""
+		Return whether any of the targets is missing or older than the files it depends on.
+		"""
+		
+		def get_mtime(path):
+			try:
+				return os.stat(path).st_mtime_ns
+			except FileNotFoundError:
+				return None
+		
+		for target in self.targets:
+			target_mtime = get_mtime(target)
+			
+			if target_mtime is None:
+				return True
+			
+			dependencies = read_dependencies(target + '.d') or []
+			
+			for i in self.sources + [j for j in global_dependencies if os.path.exists(j)] + dependencies:
+				mtime = get_mtime(i)
+				
+				# Dependencies which have been removed are treated as changed.
+				if mtime is None or mtime > target_mtime:
+					return True
+		
+		return False
+
+
+def _filter_compiled(extension, substituted_extension, names):
+	"""
+	Like filter_compiled in the makefile, return the names with the specified extension, except ones whose basename starts with a `_`, with that extension replaced.
+	"""
+	
+	return [i[:-len(extension)] + substituted_extension for i in names if i.endswith(extension) and not os.path.basename(i).startswith('_')]
+
+
+def get_jobs(settings, generated_files):
+	"""
+	Return a dict mapping target names to the jobs producing them, following the rules in the makefile, and a dict mapping the goals of the makefile to the lists of targets they build.
+	"""
+	
+	src_files = sorted(set(generated_files + _find_files('src')))
+	flat_scad_files = settings['FLAT_SCAD_FILES'].split()
+	scad_stl_files = [i for i in _filter_compiled('.scad', '.stl', [i for i in src_files if i not in flat_scad_files]) if i not in generated_files]
+	scad_dxf_files = _filter_compiled('.scad', '.dxf', [i for i in src_files if i in flat_scad_files])
+	svg_dxf_files = [i for i in _filter_compiled('.svg', '.dxf', src_files) if i not in scad_dxf_files]
+	svg_asy_files = _filter_compiled('.svg', '.asy', src_files)
+	asy_pdf_files = _filter_compiled('.asy', '.pdf', [i for i in src_files if i not in svg_asy_files])
+	scad_order_dependencies = [i for i in src_files if i.endswith(('.scad', '.dxf'))] + svg_dxf_files
+	asy_dependencies = [i for i in src_files if i.endswith('.asy')] + svg_asy_files
+	
+	python_environment = dict(PYTHONPATH = 'support')
+	inkscape_environment = dict(python_environment, INKSCAPE = settings['INKSCAPE'], DXF_FLATNESS = settings['DXF_FLATNESS'])
+	openscad_environment = dict(python_environment, OPENSCAD = settings['OPENSCAD'])
+	asymptote_environment = dict(python_environment, ASYMPTOTE = settings['ASYMPTOTE'])
+	
+	jobs = { }
+	
+	def add_job(*args):
+		job = Job(*args)
+		
+		for i in job.targets:
+			jobs[i] = job
+	
+	def add_compile_jobs(tool, targets, source_extension, environment, order_dependencies, batchable = False):
+		for i in targets:
+			source = os.path.splitext(i)[0] + source_extension
+			add_job(i, tool, [i], [settings['PYTHON'], '-m', tool], [source, i], environment, [source], [j for j in order_dependencies if j != i], batchable)
+	
+	add_job(generate_job_name, 'generate', generated_files, ['./generate_sources.sh', '--batch'], [], { }, ['generate_sources.sh'], [])
+	add_compile_jobs('inkscape', svg_dxf_files + svg_asy_files, '.svg', inkscape_environment, [])
+	add_compile_jobs('openscad', scad_dxf_files + scad_stl_files, '.scad', openscad_environment, scad_order_dependencies)
+	
+	# The Asymptote wrapper compiles several files from the same directory with a single Asymptote process.
+	add_compile_jobs('asymptote', asy_pdf_files, '.asy', asymptote_environment, asy_dependencies, True)
+	
+	goals = dict(
+		all = generated_files + scad_dxf_files + scad_stl_files + asy_pdf_files,
+		generated = generated_files,
+		dxf = svg_dxf_files + scad_dxf_files,
+		stl = scad_stl_files + [i for i in generated_files if i.endswith('.stl')],
+		asy = svg_asy_files,
+		pdf = asy_pdf_files)
+	
+	return jobs, goals
@@ -0,0 +1,94 @@
+import os, sys, socket
+from lib import util
+from . import protocol
+
+
+# This module is started for each generated file and thus must not import numpy or anything else which takes long to load.
+
+
+def _connect():
+	"""
+	Return a socket connected to the server or None, if no server is running.
+	"""
+	
+	socket_path = os.environ.get(protocol.socket_variable)
+	
+	if not socket_path:
+		return None
+	
+	connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	
+	try:
+		connection.connect(socket_path)
+	except OSError:
+		connection.close()
+		
+		return None
+	
+	return connection
+
+
+def _write_output(path, data):
+	if path == '-':
+		sys.stdout.buffer.write(data)
+		sys.stdout.buffer.flush()
+	else:
+		with util.writing_file(path) as file:
+			file.write(data)
+
+
+def _run_in_process(args):
+	"""
+	Replace this process with the batch entry point running the jobs itself.
+	"""
+	
+	sys.stdout.flush()
+	os.execv(sys.executable, [sys.executable, '-m', 'generate'] + list(args))
+
+
+def _request(connection, jobs):
+	"""
+	Send the jobs to the server and write the returned outputs. Returns False if the server refused to handle the request.
+	"""
+	
+	with connection, connection.makefile('rwb') as file:
+		request = dict(cwd = os.getcwd(), environment = { i: os.environ.get(i) for i in protocol.forwarded_variables }, jobs = jobs)
+		protocol.write_message(file, request)
+		
+		while True:
+			message, data = protocol.read_message(file)
+			
+			if message is None:
+				raise util.UserError('Connection to the server closed unexpectedly.')
+			
+			status = message.get('status')
+			
+			if status == 'done':
+				return True
+			elif status == 'restart':
+				return False
+			elif status == 'error':
+				raise util.UserError('{}', message['message'])
+			
+			sys.stderr.write(message['log'])
+			_write_output(message['output'], data)
+
+
+@util.main
+def main(*args):
+	"""
+	Generate files using the server started by `worker.server`, or using `python -m generate` in this process, if no server is running.
+	
+	Usage: python -m worker.client <generator> <input> <output> [<generator> <input> <output> ...]
+	
+	The arguments are the same as for `python -m generate`. The server is found using the environment variable GENERATOR_SOCKET. The server is not used if GENERATOR_PROFILE is set.
+	"""
+	
+	if len(args) % 3:
+		raise util.UserError('Expected a multiple of 3 arguments, but got {}.', len(args))
+	
+	# Jobs are only profiled when they are run in this process.
+	connection = None if os.environ.get(util.profile_variable) else _connect()
+	
+	if connection is None or not _request(connection, [list(i) for i in zip(args[::3], args[1::3], args[2::3])]):
+		_run_in_process(args)
@@ -0,0 +1,37 @@
+import json
+
+
+# Name of the environment variable which holds the path of the Unix socket the generator server listens on.
+socket_variable = 'GENERATOR_SOCKET'
+
+# Environment variables which are passed from the client to the server and are set while a request is handled.
+forwarded_variables = ['GENERATOR_CACHE_DIR']
+
+
+def write_message(file, message, data = b''):
+	"""
+	Write a message to a binary file, consisting of a line containing the specified dict encoded as JSON, followed by the specified payload.
+	"""
+	
+	file.write(json.dumps(dict(message, length = len(data))).encode() + b'\n')
+	file.write(data)
+	file.flush()
+
+
+def read_message(file):
+	"""
+	Read a message written by `write_message()`. Returns the dict and the payload or None and an empty payload if the connection was closed.
+	"""
+	
+	line = file.readline()
+	
+	if not line:
+		return None, b''
+	
+	message = json.loads(line.decode())
+	data = file.read(message['length'])
+	
+	if len(data) < message['length']:
+		raise EOFError('Connection closed while reading a message.')
+	
+	return message, data
@@ -0,0 +1,255 @@
+import os, io, sys, socket, pkgutil, importlib, traceback, contextlib, collections
+from lib import util, trace, session, cache, make
+from . import protocol
+
+
+# Number of input files for which the loaded polyhedra and the data derived from them are kept.
+session_count = 32
+
+# Time in seconds after which an idle worker process exits.
+idle_timeout = 3600
+
+# Name of the environment variable which overrides the number of worker processes, each of which handles one request at a time. Defaults to the number of CPUs.
+worker_count_variable = 'GENERATOR_WORKER_COUNT'
+
+
+def _get_source_files():
+	"""
+	Return the paths of the source files of all loaded modules within the directory containing the `lib` package.
+	"""
+	
+	root = os.path.dirname(os.path.dirname(os.path.abspath(util.__file__))) + os.sep
+	files = (getattr(i, '__file__', None) for i in list(sys.modules.values()))
+	
+	return sorted(set(os.path.abspath(i) for i in files if i and os.path.abspath(i).startswith(root)))
+
+
+def _get_mtimes(file_paths):
+	def get_mtime(path):
+		try:
+			return os.stat(path).st_mtime_ns
+		except FileNotFoundError:
+			return None
+	
+	return { i: get_mtime(i) for i in file_paths }
+
+
+@contextlib.contextmanager
+def _request_environment(cwd, environment):
+	"""
+	Context manager which sets the working directory and the forwarded environment variables of a client while it is active.
+	"""
+	
+	saved_cwd = os.getcwd()
+	saved_environment = { i: os.environ.get(i) for i in protocol.forwarded_variables }
+	
+	def set_environment(values):
+		for k, v in values.items():
+			if v is None:
+				os.environ.pop(k, None)
+			else:
+				os.environ[k] = v
+	
+	os.chdir(cwd)
+	set_environment({ i: environment.get(i) for i in protocol.forwarded_variables })
+	
+	try:
+		yield
+	finally:
+		set_environment(saved_environment)
+		os.chdir(saved_cwd)
+
+
+class Server:
+	"""
+	Handles requests from `worker.client` using generators which are imported once. The sessions holding the polyhedra loaded from each input file are kept between requests, as long as the file does not change.
+	"""
+	
+	def __init__(self):
+		self._modules = { i.name: importlib.import_module('generate.' + i.name) for i in pkgutil.iter_modules(importlib.import_module('generate').__path__) if i.name != '__main__' }
+		self._source_mtimes = _get_mtimes(_get_source_files())
+		
+		# Maps absolute paths of input files to their modification time and size and a session, least recently used first.
+		self._sessions = collections.OrderedDict()
+	
+	def _sources_changed(self):
+		return _get_mtimes(self._source_mtimes) != self._source_mtimes
+	
+	def _get_session(self, src_path):
+		path = os.path.abspath(src_path)
+		stat = os.stat(path)
+		signature = stat.st_mtime_ns, stat.st_size
+		entry = self._sessions.pop(path, None)
+		
+		if entry is None or entry[0] != signature:
+			entry = signature, session.Session()
+		
+		self._sessions[path] = entry
+		
+		while len(self._sessions) > session_count:
+			self._sessions.popitem(last = False)
+		
+		return entry[1]
+	
+	def _get_module(self, generator_name):
+		module = self._modules.get(generator_name)
+		
+		if module is None or not hasattr(module, 'generate'):
+			raise util.UserError('Unknown generator: {}', generator_name)
+		
+		return module
+	
+	def _run_job(self, module, generator_name, src_path):
+		"""
+		Run a single job and return the output as bytes and the messages logged by the generator.
+		"""
+		
+		name, _ = os.path.splitext(os.path.basename(src_path))
+		output = util.output_file()
+		log = io.StringIO()
+		
+		with contextlib.redirect_stderr(log), trace.trace_context(generator = generator_name, input = name):
+			module.generate(output, src_path, self._get_session(src_path))
+		
+		return util.get_output_data(output), log.getvalue()
+	
+	def handle(self, file):
+		"""
+		Handle a request read from the specified connection. Returns False if the server should exit.
+		"""
+		
+		request, _ = protocol.read_message(file)
+		
+		if request is None:
+			return True
+		
+		# Outputs must not be produced by outdated code. The client falls back to running the generators itself.
+		if self._sources_changed():
+			protocol.write_message(file, dict(status = 'restart'))
+			
+			return False
+		
+		with _request_environment(request['cwd'], request['environment']):
+			manifest = cache.manifest()
+			
+			for generator_name, src_path, output_path in request['jobs']:
+				try:
+					module = self._get_module(generator_name)
+					key = manifest.job_key(module, src_path)
+					
+					# The output file is written by the client, but the server has the same working directory.
+					if output_path != '-':
+						make.write_generator_dependencies(output_path, module, src_path)
+						
+						if manifest.is_current(output_path, key):
+							# Mark the file as up to date for make, which compares it to its dependencies.
+							os.utime(output_path)
+							
+							continue
+					
+					output, log = self._run_job(module, generator_name, src_path)
+				except util.UserError as e:
+					protocol.write_message(file, dict(status = 'error', message = str(e)))
+					
+					return True
+				except Exception:
+					protocol.write_message(file, dict(status = 'error', message = traceback.format_exc()))
+					
+					return True
+				
+				protocol.write_message(file, dict(output = output_path, log = log), output)
+				manifest.record(output_path, key, output)
+		
+		protocol.write_message(file, dict(status = 'done'))
+		
+		return True
+
+
+def _serve(server, listener):
+	"""
+	Handle requests accepted on the specified socket until no request has been received for `idle_timeout` seconds or the source code changed. Run by each worker process.
+	"""
+	
+	while True:
+		try:
+			connection, _ = listener.accept()
+		except socket.timeout:
+			util.log('Worker exiting after being idle for {} seconds.', idle_timeout)
+			
+			break
+		
+		connection.settimeout(None)
+		
+		with connection, connection.makefile('rwb') as file:
+			try:
+				if not server.handle(file):
+					util.log('Worker exiting because the source code changed.')
+					
+					break
+			except (OSError, EOFError) as e:
+				util.log('Warning: Request failed: {}', e)
+
+
+def _is_listening(socket_path):
+	with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+		try:
+			client.connect(socket_path)
+		except OSError:
+			return False
+	
+	return True
+
+
+@util.main
+def main(socket_path = None):
+	"""
+	Run a server which generates files on behalf of `worker.client`, keeping the generators loaded between requests.
+	
+	Usage: python -m worker.server [<socket>]
+	
+	The socket path defaults to the value of the environment variable GENERATOR_SOCKET. Requests are handled concurrently by one worker process per CPU or as many as set by GENERATOR_WORKER_COUNT, which are forked after the generators have been imported and each keep their own sessions. A worker exits when it has been idle for an hour or when the source code of the generators changes. The server exits when all workers have exited.
+	"""
+	
+	if socket_path is None:
+		socket_path = os.environ.get(protocol.socket_variable)
+		
+		if not socket_path:
+			raise util.UserError('No socket path given and {} is not set.', protocol.socket_variable)
+	
+	if os.path.exists(socket_path):
+		if _is_listening(socket_path):
+			raise util.UserError('A server is already listening on {}.', socket_path)
+		
+		os.unlink(socket_path)
+	
+	worker_count = int(os.environ.get(worker_count_variable) or os.cpu_count() or 1)
+	server = Server()
+	listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+	
+	try:
+		listener.bind(socket_path)
+		listener.listen()
+		listener.settimeout(idle_timeout)
+		util.log('Listening on {} with {} workers.', socket_path, worker_count)
+		worker_pids = []
+		
+		for _ in range(worker_count):
+			pid = os.fork()
+			
+			if not pid:
+				# Workers must not remove the socket when they exit, so they never return from here.
+				try:
+					_serve(server, listener)
+				except BaseException:
+					traceback.print_exc()
+					os._exit(1)
+				
+				os._exit(0)
+			
+			worker_pids.append(pid)
+		
+		for i in worker_pids:
+			os.waitpid(i, 0)
+	finally:
+		listener.close()
+		os.unlink(socket_path)
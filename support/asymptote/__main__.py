@@ -2,10 +2,13 @@ import sys, os, shutil
 from lib import util, make
 
 
-def _asymptote(in_path, out_path, asymptote_dir, working_dir):
-	args = [os.environ['ASYMPTOTE'], '-vv', '-f', 'pdf', '-o', out_path, in_path]
+def _asymptote(in_paths, out_path, asymptote_dir, working_dir):
+	args = [os.environ['ASYMPTOTE'], '-vv', '-f', 'pdf']
 	
-	with util.command_context(args, set_env = { 'ASYMPTOTE_DIR': asymptote_dir }, working_dir = working_dir, use_stderr = True) as process:
+	if out_path is not None:
+		args += ['-o', out_path]
+	
+	with util.command_context(args + in_paths, set_env = { 'ASYMPTOTE_DIR': asymptote_dir }, working_dir = working_dir, use_stderr = True) as process:
 		def get_loaded_file(line):
 			if any(line.startswith(j) for j in ['Loading ', 'Including ']):
 				parts = line.rstrip('\n').split(' ')
@@ -32,26 +35,112 @@ def _asymptote(in_path, out_path, asymptote_dir, working_dir):
 	return loaded_files
 
 
-@util.main
-def main(in_path, out_path):
+def _split_loaded_files(in_paths, loaded_files):
+	"""
+	Split the list of files loaded by a single Asymptote process compiling the specified files into the lists of files loaded while compiling each of them. Returns None if the list cannot be split.
+	
+	Each input file is itself reported as loaded before the files it imports. Files loaded before the first input file, like the modules Asymptote loads automatically, are attributed to all input files.
+	"""
+	
+	common_files = []
+	files_by_input = []
+	
+	for i in loaded_files:
+		if len(files_by_input) < len(in_paths) and os.path.relpath(i) == os.path.relpath(in_paths[len(files_by_input)]):
+			files_by_input.append([])
+		elif files_by_input:
+			files_by_input[-1].append(i)
+		else:
+			common_files.append(i)
+	
+	if len(files_by_input) < len(in_paths):
+		return None
+	
+	return [common_files + i for i in files_by_input]
+
+
+def _write_outputs(in_path, out_path, temp_out_path, loaded_files):
+	if not os.path.exists(temp_out_path):
+		raise util.UserError('Asymptote did not generate a PDF file.')
+	
+	# All dependencies as paths relative to the project root.
+	dependencies = set(map(os.path.relpath, loaded_files))
+	
+	# Write output files.
+	make.write_dependencies(out_path + '.d', out_path, dependencies - { in_path })
+	shutil.copyfile(temp_out_path, out_path)
+
+
+def _compile(in_path, out_path):
 	try:
-		_, out_suffix = os.path.splitext(out_path)
-		
 		with util.TemporaryDirectory() as temp_dir:
 			absolute_in_path = os.path.abspath(in_path)
 			temp_out_path = os.path.join(temp_dir, 'out.pdf')
 			
 			# Asymptote creates A LOT of temp files (presumably when invoking LaTeX) and leaves some of them behind. Thus we run asymptote in a temporary directory.
-			loaded_files = _asymptote(absolute_in_path, 'out', os.path.dirname(absolute_in_path), temp_dir)
-			
-			if not os.path.exists(temp_out_path):
-				raise util.UserError('Asymptote did not generate a PDF file.', in_path)
+			loaded_files = _asymptote([absolute_in_path], 'out', os.path.dirname(absolute_in_path), temp_dir)
 			
-			# All dependencies as paths relative to the project root.
-			dependencies = set(map(os.path.relpath, loaded_files))
-			
-			# Write output files.
-			make.write_dependencies(out_path + '.d', out_path, dependencies - { in_path })
-			shutil.copyfile(temp_out_path, out_path)
+			_write_outputs(in_path, out_path, temp_out_path, loaded_files)
 	except util.UserError as e:
 		raise util.UserError('While processing {}: {}', in_path, e)
+
+
+def _compile_batch(in_paths, out_paths):
+	"""
+	Compile several Asymptote files from the same directory in a single Asymptote process, which saves starting Asymptote and LaTeX for each file.
+	
+	Falls back to compiling the files individually if the files loaded by Asymptote cannot be attributed to the individual files.
+	"""
+	
+	with util.TemporaryDirectory() as temp_dir:
+		absolute_in_paths = map(os.path.abspath, in_paths)
+		
+		try:
+			# Without -o, Asymptote names each PDF file after the input file and writes it to the working directory.
+			loaded_files = _asymptote(absolute_in_paths, None, os.path.dirname(absolute_in_paths[0]), temp_dir)
+			loaded_files_by_input = _split_loaded_files(in_paths, loaded_files)
+			
+			if loaded_files_by_input is None:
+				print >> sys.stderr, 'Warning: Could not determine the dependencies of the files compiled together, compiling them individually.'
+		except util.UserError:
+			# Compiling the files individually reports which of them failed.
+			loaded_files_by_input = None
+		
+		if loaded_files_by_input is None:
+			for in_path, out_path in zip(in_paths, out_paths):
+				_compile(in_path, out_path)
+		else:
+			for in_path, out_path, loaded_files in zip(in_paths, out_paths, loaded_files_by_input):
+				name, _ = os.path.splitext(os.path.basename(in_path))
+				
+				try:
+					_write_outputs(in_path, out_path, os.path.join(temp_dir, name + '.pdf'), loaded_files)
+				except util.UserError as e:
+					raise util.UserError('While processing {}: {}', in_path, e)
+
+
+@util.main
+def main(*args):
+	"""
+	Compile Asymptote files to PDF files and write a dependency file for each of them.
+	
+	Usage: python -m asymptote <in.asy> <out.pdf> [<in.asy> <out.pdf> ...]
+	
+	Files from the same directory are compiled by a single Asymptote process.
+	"""
+	
+	if not args or len(args) % 2:
+		raise util.UserError('Expected pairs of input and output files.')
+	
+	in_paths_by_dir = { }
+	
+	for in_path, out_path in zip(args[::2], args[1::2]):
+		in_paths_by_dir.setdefault(os.path.dirname(os.path.abspath(in_path)), []).append((in_path, out_path))
+	
+	for _, pairs in sorted(in_paths_by_dir.items()):
+		in_paths, out_paths = zip(*pairs)
+		
+		if len(pairs) == 1:
+			_compile(in_paths[0], out_paths[0])
+		else:
+			_compile_batch(list(in_paths), list(out_paths))
@@ -3,3 +3,100 @@ from . import util
 
 def write_dependencies(path, target, dependencies):
 	util.write_file(path, '{}: {}\n'.format(target, ' '.join(dependencies)).encode())
+
+
+def _split_words(text):
+	"""
+	Split a list of file names from a makefile at unescaped whitespace and remove the escaping.
+	"""
+	
+	words = []
+	word = []
+	i = 0
+	
+	while i < len(text):
+		c = text[i]
+		
+		if c == '\\' and i + 1 < len(text) and text[i + 1] in ' \t#:\\':
+			word.append(text[i + 1])
+			i += 1
+		elif c == '$' and text[i + 1:i + 2] == '$':
+			word.append('$')
+			i += 1
+		elif c in ' \t':
+			if word:
+				words.append(''.join(word))
+				word = []
+		else:
+			word.append(c)
+		
+		i += 1
+	
+	if word:
+		words.append(''.join(word))
+	
+	return words
+
+
+def _find_unescaped(text, chars):
+	"""
+	Return the index of the first occurrence of any of the specified characters in text which is not escaped by a backslash, or -1.
+	"""
+	
+	i = 0
+	
+	while i < len(text):
+		if text[i] == '\\':
+			i += 1
+		elif text[i] in chars:
+			return i
+		
+		i += 1
+	
+	return -1
+
+
+def parse_dependencies(text):
+	"""
+	Parse the rules of a makefile containing only rules without commands, as written by OpenSCAD using its -d option, and return a list of tuples of the list of targets and the list of prerequisites of each rule.
+	
+	Supports continuation lines, comments, multiple targets and prerequisites, order-only prerequisites and file names containing spaces escaped with backslashes.
+	"""
+	
+	rules = []
+	
+	# A backslash at the end of a line joins it with the next line.
+	for line in text.replace('\\\r\n', ' ').replace('\\\n', ' ').splitlines():
+		comment_start = _find_unescaped(line, '#')
+		
+		if comment_start >= 0:
+			line = line[:comment_start]
+		
+		if not line.strip():
+			continue
+		
+		colon = _find_unescaped(line, ':')
+		
+		if colon < 0:
+			raise util.UserError('Invalid line in dependency file: {}', line)
+		
+		# `target:: prerequisites` declares a double-colon rule.
+		prerequisites = line[colon + 1:].lstrip(':')
+		rules.append((_split_words(line[:colon]), [i for i in _split_words(prerequisites) if i != '|']))
+	
+	return rules
+
+
+def read_dependencies(path):
+	"""
+	Return the names of all files mentioned as targets or prerequisites in the dependency file at the specified path.
+	"""
+	
+	files = []
+	
+	for targets, prerequisites in parse_dependencies(util.read_file(path).decode('utf-8')):
+		for i in targets + prerequisites:
+			if i not in files:
+				files.append(i)
+	
+	return files